@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Compares two result files written by `benchmarks.run`.
+
+    python -m benchmarks.compare before.json after.json --threshold 1.1
+
+Exits with status 1 when a phase median, or the peak memory, grew by more
+than the threshold ratio.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as results_file:
+        return json.load(results_file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=1.1)
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    if before['params'] != after['params']:
+        print("warning: results were produced with different parameters")
+
+    rows = []
+    for phase in sorted(set(before['timings']) & set(after['timings'])):
+        rows.append((
+            phase,
+            before['timings'][phase]['median'],
+            after['timings'][phase]['median'],
+        ))
+    if before.get('peak_memory_bytes') and after.get('peak_memory_bytes'):
+        rows.append(('peak_memory_bytes', before['peak_memory_bytes'], after['peak_memory_bytes']))
+
+    regressed = False
+    print("{0:<20} {1:>14} {2:>14} {3:>8}".format('', 'before', 'after', 'ratio'))
+    for name, old, new in rows:
+        ratio = new / old if old else float('inf')
+        flag = ''
+        if ratio > args.threshold:
+            regressed = True
+            flag = ' !'
+        print("{0:<20} {1:>14.4f} {2:>14.4f} {3:>8.2f}{4}".format(name, old, new, ratio, flag))
+
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
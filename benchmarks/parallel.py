@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Compares serial and thread-pool endpoint introspection.
+
+    python -m benchmarks.parallel --endpoints 2000 --workers 8
+
+Checks that both modes generate byte-identical documents.
+
+On CPython, parsing YAML docstrings holds the GIL and threads bring no
+speedup: 22.3s serial against 23.2s with 8 workers for 2,000 endpoints
+(0.96x), which is why `introspection_workers` is off by default.
+"""
+import argparse
+import sys
+import time
+
+from .settings import configure
+
+
+def generate(config, version='v1'):
+    from rest_framework_swagger.spec import build_document, render_document
+    from rest_framework_swagger.cache import clear_all_caches
+
+    # every run starts cold
+    clear_all_caches()
+
+    start = time.time()
+    content = render_document(build_document('default', version, config=config))
+    return time.time() - start, content
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--endpoints', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args(argv)
+
+    configure()
+    from .synthetic import build_urlconf
+    build_urlconf(args.endpoints)
+
+    config = {'basePath': ''}
+    serial_time, serial_content = generate(dict(config, introspection_workers=0))
+    parallel_time, parallel_content = generate(dict(config, introspection_workers=args.workers))
+
+    print("endpoints: {0}".format(args.endpoints))
+    print("serial: {0:.3f}s".format(serial_time))
+    print("parallel ({0} workers): {1:.3f}s".format(args.workers, parallel_time))
+    speedup = serial_time / parallel_time
+    print("speedup: {0:.2f}x".format(speedup))
+    if speedup < 1.1:
+        print("no gain from threads: YAML parsing holds the GIL, "
+              "keep introspection_workers off")
+
+    if serial_content != parallel_content:
+        print("documents differ between serial and parallel modes")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
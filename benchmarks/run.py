@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Times swagger document generation on a synthetic project.
+
+    python -m benchmarks.run --endpoints 2000 --nesting 3 --output results.json
+
+Each phase (URL walk, paths, definitions, JSON rendering) is timed on its
+own, from cold caches unless --warm is given. Peak memory of a full
+generation is measured in a separate pass. Results are written as JSON so
+runs on different commits can be compared with `benchmarks.compare`.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from .settings import configure
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def clear_caches():
+    from rest_framework_swagger.cache import clear_all_caches
+    clear_all_caches()
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.STDOUT
+        ).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_call(func, *args):
+    start = time.time()
+    result = func(*args)
+    return time.time() - start, result
+
+
+def run_phases(config, version):
+    from rest_framework_swagger.docgenerator import DocumentationGenerator
+    from rest_framework_swagger.spec import render_document
+    from rest_framework_swagger.urlparser import UrlParser
+
+    timings = {}
+    timings['get_apis'], endpoints = time_call(UrlParser(config, None).get_apis)
+
+    generator = DocumentationGenerator(config=config, config_name='default', version=version)
+    timings['get_paths'], _ = time_call(generator.get_paths, endpoints)
+
+    generator = DocumentationGenerator(config=config, config_name='default', version=version)
+    timings['get_definitions'], _ = time_call(generator.get_definitions, endpoints)
+
+    generator = DocumentationGenerator(config=config, config_name='default', version=version)
+    timings['get_root'], document = time_call(generator.get_root, endpoints)
+    timings['render'], content = time_call(render_document, document)
+
+    return timings, len(endpoints), len(content)
+
+
+def measure_peak_memory(config, version):
+    """
+    Returns the peak memory allocated by a full generation and rendering
+    """
+    from rest_framework_swagger.spec import build_document, render_document
+
+    if tracemalloc is None:
+        return None
+    tracemalloc.start()
+    try:
+        render_document(build_document('default', version, config=config))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        'min': samples[0],
+        'median': samples[len(samples) // 2],
+        'max': samples[-1],
+        'samples': samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--endpoints', type=int, default=500)
+    parser.add_argument('--nesting', type=int, default=2,
+                        help="depth of the nested serializers of every endpoint")
+    parser.add_argument('--docstring-params', type=int, default=3,
+                        help="parameters declared by every YAML docstring")
+    parser.add_argument('--kinds', default=','.join(('apiview', 'generic', 'viewset', 'function')),
+                        help="comma separated view kinds to generate")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=0,
+                        help="introspection_workers of the swagger config")
+    parser.add_argument('--warm', action='store_true',
+                        help="keep the caches between repetitions")
+    parser.add_argument('--output', default=None,
+                        help="file to write the JSON results to, stdout by default")
+    args = parser.parse_args(argv)
+
+    configure()
+    import django
+    import rest_framework
+    from .synthetic import build_urlconf
+
+    build_urlconf(args.endpoints, nesting=args.nesting,
+                  docstring_params=args.docstring_params,
+                  kinds=tuple(args.kinds.split(',')))
+
+    config = {'basePath': '', 'introspection_workers': args.workers}
+    version = 'v1'
+
+    samples = {}
+    for _ in range(args.repeat):
+        if not args.warm:
+            clear_caches()
+        timings, endpoint_count, content_length = run_phases(config, version)
+        for phase, elapsed in timings.items():
+            samples.setdefault(phase, []).append(elapsed)
+
+    clear_caches()
+    results = {
+        'commit': get_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'djangorestframework': rest_framework.VERSION,
+        'params': {
+            'endpoints': args.endpoints,
+            'nesting': args.nesting,
+            'docstring_params': args.docstring_params,
+            'kinds': args.kinds,
+            'repeat': args.repeat,
+            'workers': args.workers,
+            'warm': args.warm,
+        },
+        'url_patterns': endpoint_count,
+        'document_bytes': content_length,
+        'timings': dict((phase, summarize(values)) for phase, values in samples.items()),
+        'peak_memory_bytes': measure_peak_memory(config, version),
+    }
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as results_file:
+            results_file.write(output + '\n')
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""Minimal Django settings for the benchmarks."""
+import django
+from django.conf import settings
+
+SYNTHETIC_URLCONF = 'benchmarks_synthetic_urls'
+
+
+def configure():
+    if settings.configured:
+        return
+    settings.configure(
+        DEBUG=False,
+        SECRET_KEY='benchmarks',
+        ROOT_URLCONF=SYNTHETIC_URLCONF,
+        INSTALLED_APPS=(
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'rest_framework',
+            'rest_framework_swagger',
+        ),
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            }
+        },
+        SWAGGER_GLOBAL_SETTINGS={},
+        SWAGGER_LOCAL_SETTINGS={'default': {}},
+    )
+    if hasattr(django, 'setup'):
+        django.setup()
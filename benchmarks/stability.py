@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Generates the same document repeatedly in one process.
+
+    python -m benchmarks.stability --endpoints 200 --runs 10
+
+Fails when the memory held after a generation keeps growing once the caches
+are warm, which is what registries shared between generations did, or when
+a generation renders different bytes than the first one. Memory is
+measured with tracemalloc, or as a count of objects tracked by the garbage
+collector where tracemalloc is missing (Python 2).
+"""
+import argparse
+import gc
+import sys
+
+from .settings import configure
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def generate(config, version='v1'):
+    from rest_framework_swagger.spec import build_document, render_document
+    return render_document(build_document('default', version, config=config))
+
+
+def measure_memory():
+    """
+    Returns the memory held once garbage is collected, in bytes, or in
+    objects without tracemalloc
+    """
+    gc.collect()
+    if tracemalloc is not None:
+        return tracemalloc.get_traced_memory()[0]
+    return len(gc.get_objects())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--endpoints', type=int, default=200)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=2,
+                        help="generations filling the caches before measuring")
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help="growth ratio allowed over the measured generations")
+    args = parser.parse_args(argv)
+
+    configure()
+    from .synthetic import build_urlconf
+    from rest_framework_swagger.cache import clear_all_caches
+
+    build_urlconf(args.endpoints)
+    clear_all_caches()
+    config = {'basePath': ''}
+
+    if tracemalloc is not None:
+        tracemalloc.start()
+    unit = 'bytes' if tracemalloc is not None else 'objects'
+
+    first = generate(config)
+    for _ in range(args.warmup - 1):
+        generate(config)
+
+    samples = []
+    identical = True
+    for run in range(args.runs):
+        content = generate(config)
+        samples.append(measure_memory())
+        print("run {0}: {1} {2}".format(run + 1, samples[-1], unit))
+        if content != first:
+            print("run {0} rendered a different document".format(run + 1))
+            identical = False
+
+    if tracemalloc is not None:
+        tracemalloc.stop()
+
+    growth = float(samples[-1] - samples[0]) / samples[0]
+    print("growth: {0:+.2%}".format(growth))
+    if growth > args.tolerance:
+        print("memory grows from one generation to the next")
+        return 1
+    if not identical:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
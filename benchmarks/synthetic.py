@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Builds synthetic URLconfs with many documented endpoints.
+
+Endpoints cycle through the kinds of views the generator knows about:
+APIViews, GenericAPIViews, ViewSets registered on a router and `@api_view`
+functions. Each endpoint gets its own serializer, nesting a chain of
+`nesting` serializers shared by every endpoint of its group, and a YAML
+docstring declaring `docstring_params` parameters.
+
+The generated module is registered in `sys.modules`, so the YAML references
+of its docstrings resolve like those of a real project.
+"""
+import sys
+import types
+
+from django.conf.urls import include, url
+
+from .settings import SYNTHETIC_URLCONF
+
+VIEW_KINDS = ('apiview', 'generic', 'viewset', 'function')
+
+GROUPS = 10
+
+DOCSTRING = """
+    Synthetic {kind} endpoint number {index}.
+
+    Returns the resources of the endpoint.
+    ---
+    operationId: {operation_id}
+    serializer: {serializer}
+    tags:
+        - group{group}
+    parameters:
+{parameters}
+    responseMessages:
+        - code: 404
+          description: Not found
+"""
+
+PARAMETER = """\
+        - name: param{index}
+          description: Synthetic parameter {index}
+          in: query
+          type: string
+"""
+
+
+def make_docstring(kind, index, method, docstring_params):
+    return DOCSTRING.format(
+        kind=kind,
+        index=index,
+        operation_id='{0}Resource{1}'.format(method, index),
+        serializer='Resource{0}Serializer'.format(index),
+        group=index % GROUPS,
+        parameters=''.join(PARAMETER.format(index=i) for i in range(docstring_params)),
+    )
+
+
+def add_to_module(module, name, obj):
+    obj.__module__ = module.__name__
+    setattr(module, name, obj)
+    return obj
+
+
+def make_nested_serializers(module, nesting):
+    """
+    Returns, for every group, the outermost serializer of a chain of
+    `nesting` serializers, each one nesting the next
+    """
+    from rest_framework import serializers
+
+    chains = []
+    for group in range(GROUPS):
+        nested = None
+        for level in range(nesting, 0, -1):
+            attrs = {
+                'label': serializers.CharField(),
+                'weight': serializers.FloatField(required=False),
+            }
+            if nested is not None:
+                attrs['child'] = nested()
+                attrs['children'] = nested(many=True)
+            name = 'Group{0}Level{1}Serializer'.format(group, level)
+            nested = add_to_module(module, name, type(name, (serializers.Serializer,), attrs))
+        chains.append(nested)
+    return chains
+
+
+def make_serializer(module, index, nested):
+    from rest_framework import serializers
+
+    attrs = {
+        'name': serializers.CharField(help_text='Name of the resource'),
+        'count': serializers.IntegerField(required=False),
+        'enabled': serializers.BooleanField(default=True),
+        'created': serializers.DateTimeField(read_only=True),
+        'status': serializers.ChoiceField(choices=[(1, 'active'), (2, 'archived')]),
+    }
+    if nested is not None:
+        attrs['details'] = nested()
+    name = 'Resource{0}Serializer'.format(index)
+    return add_to_module(module, name, type(name, (serializers.Serializer,), attrs))
+
+
+def make_handler(kind, index, method, docstring_params):
+    def handler(self, request, *args, **kwargs):
+        pass
+    handler.__name__ = method
+    handler.__doc__ = make_docstring(kind, index, method, docstring_params)
+    return handler
+
+
+def make_api_view(module, index, serializer, docstring_params):
+    from rest_framework.views import APIView
+
+    attrs = {
+        '__doc__': 'Resource {0} collection.'.format(index),
+        'get': make_handler('apiview', index, 'get', docstring_params),
+        'post': make_handler('apiview', index, 'post', docstring_params),
+    }
+    name = 'Resource{0}View'.format(index)
+    return add_to_module(module, name, type(name, (APIView,), attrs))
+
+
+def make_generic_view(module, index, serializer, docstring_params):
+    from rest_framework import generics
+
+    attrs = {
+        '__doc__': 'Resource {0} collection.'.format(index),
+        'serializer_class': serializer,
+        'list': make_handler('generic', index, 'list', docstring_params),
+        'create': make_handler('generic', index, 'create', docstring_params),
+    }
+    name = 'Resource{0}ListView'.format(index)
+    return add_to_module(module, name, type(name, (generics.ListCreateAPIView,), attrs))
+
+
+def make_viewset(module, index, serializer, docstring_params):
+    from rest_framework import mixins, viewsets
+
+    attrs = {
+        '__doc__': 'Resource {0} viewset.'.format(index),
+        'serializer_class': serializer,
+        'list': make_handler('viewset', index, 'list', docstring_params),
+        'retrieve': make_handler('viewset', index, 'retrieve', docstring_params),
+        'create': make_handler('viewset', index, 'create', docstring_params),
+    }
+    bases = (mixins.ListModelMixin, mixins.RetrieveModelMixin,
+             mixins.CreateModelMixin, viewsets.GenericViewSet)
+    name = 'Resource{0}ViewSet'.format(index)
+    return add_to_module(module, name, type(name, bases, attrs))
+
+
+def make_function_view(module, index, serializer, docstring_params):
+    from rest_framework.decorators import api_view
+
+    def function_view(request):
+        pass
+    function_view.__name__ = 'resource{0}_view'.format(index)
+    function_view.__doc__ = make_docstring('function', index, 'get', docstring_params)
+    add_to_module(module, function_view.__name__, function_view)
+    return api_view(['GET', 'POST'])(function_view)
+
+
+def build_urlconf(endpoints=2000, nesting=2, docstring_params=3,
+                  kinds=VIEW_KINDS, name=SYNTHETIC_URLCONF):
+    """
+    Registers a URLconf module of `endpoints` documented endpoints.
+    Router registered ViewSets count as one endpoint each, although they
+    produce both a list and a detail URL.
+    """
+    from rest_framework.routers import SimpleRouter
+
+    module = types.ModuleType(name)
+    sys.modules[name] = module
+
+    chains = make_nested_serializers(module, nesting) if nesting else [None] * GROUPS
+    router = SimpleRouter()
+    urlpatterns = []
+    for index in range(endpoints):
+        kind = kinds[index % len(kinds)]
+        serializer = make_serializer(module, index, chains[index % GROUPS])
+        prefix = r'resources{0}'.format(index)
+
+        if kind == 'apiview':
+            view = make_api_view(module, index, serializer, docstring_params)
+            urlpatterns.append(url(
+                r'^{0}/(?P<pk>[0-9]+)/$'.format(prefix), view.as_view(),
+                name='resource-{0}'.format(index)))
+        elif kind == 'generic':
+            view = make_generic_view(module, index, serializer, docstring_params)
+            urlpatterns.append(url(
+                r'^{0}/$'.format(prefix), view.as_view(),
+                name='resource-{0}'.format(index)))
+        elif kind == 'viewset':
+            viewset = make_viewset(module, index, serializer, docstring_params)
+            router.register(prefix, viewset, base_name='resource-{0}'.format(index))
+        elif kind == 'function':
+            view = make_function_view(module, index, serializer, docstring_params)
+            urlpatterns.append(url(
+                r'^{0}/$'.format(prefix), view,
+                name='resource-{0}'.format(index)))
+
+    urlpatterns.append(url(r'^router/', include(router.urls)))
+    module.urlpatterns = urlpatterns
+    return module
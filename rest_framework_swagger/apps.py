@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+from django.apps import AppConfig
+from django.core import checks
+
+
+class RestFrameworkSwaggerConfig(AppConfig):
+    name = 'rest_framework_swagger'
+    verbose_name = 'Django REST Swagger'
+
+    def ready(self):
+        from .checks import check_docstring_references
+        from .warmup import schedule_warmup
+        checks.register(check_docstring_references)
+        schedule_warmup()
@@ -0,0 +1,597 @@
+# -*- coding: utf-8 -*-
+"""Cache of generated Swagger documents, with pluggable storage backends."""
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test.signals import setting_changed
+
+from .compat import get_cache, import_string
+from .config import get_global_setting
+from .endpointcache import describe
+from .spec import compress_content, get_etag, render_document
+from .utils import LRUCache
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Settings whose modification invalidates every cached document
+WATCHED_SETTINGS = ('SWAGGER_GLOBAL_SETTINGS', 'SWAGGER_LOCAL_SETTINGS')
+
+# Settings whose modification clears every cache, see clear_all_caches
+RESET_SETTINGS = WATCHED_SETTINGS + ('ROOT_URLCONF', 'REST_FRAMEWORK')
+
+DEFAULT_SPEC_STORE = 'rest_framework_swagger.cache.LocalMemorySpecStore'
+
+# Seconds after which the stores outliving the process drop an entry
+DEFAULT_SPEC_TIMEOUT = 24 * 60 * 60
+
+# Partial documents are selected by the URL, so any client can ask for new
+# ones: they are kept in a bounded cache of the process rather than in the
+# store of the config
+PARTIAL_SPECS_MAXSIZE = 32
+
+
+class RenderedSpec(object):
+    """
+    A generated Swagger document along with its serialized content and the
+    validators used for conditional requests.
+
+    Specs loaded from a shared store only carry their content; the document
+    is decoded from it on first access.
+    """
+    # Whether the content should be streamed instead of copied in a response
+    streamed = False
+
+    def __init__(self, document=None, content=None, etag=None, last_modified=None,
+                 encoded=None):
+        if content is None:
+            content = render_document(document)
+        self._document = document
+        self.content = content
+        self.etag = etag or get_etag(content)
+        self.last_modified = last_modified or time.time()
+        # content codings (gzip, br) of the content, computed once by compress()
+        self.encoded = encoded or {}
+
+    @property
+    def document(self):
+        if self._document is None:
+            self._document = json.loads(bytes(self.content).decode('utf-8'))
+        return self._document
+
+    @property
+    def encodings(self):
+        return list(self.encoded)
+
+    def compress(self):
+        self.encoded = compress_content(self.content)
+        return self
+
+    def get_content(self, encoding=None):
+        if encoding is None:
+            return self.content
+        return self.encoded[encoding]
+
+    def iter_content(self, chunk_size=64 * 1024, encoding=None):
+        content = self.get_content(encoding)
+        for offset in range(0, len(content), chunk_size):
+            yield content[offset:offset + chunk_size]
+
+
+class MappedSpec(RenderedSpec):
+    """
+    A spec whose content is read from a memory-mapped file shared by every
+    process of the host
+    """
+    streamed = True
+
+    def __init__(self, mapping, offset, etag, last_modified, length=None, encoded=None):
+        self._document = None
+        self.mapping = mapping
+        self.offset = offset
+        self.length = len(mapping) - offset if length is None else length
+        self.etag = etag
+        self.last_modified = last_modified
+        # (offset, length) of the content codings within the mapping
+        self.encoded_ranges = encoded or {}
+
+    @property
+    def encodings(self):
+        return list(self.encoded_ranges)
+
+    @property
+    def content(self):
+        return self.mapping[self.offset:self.offset + self.length]
+
+    def _get_range(self, encoding=None):
+        if encoding is None:
+            return self.offset, self.length
+        return self.encoded_ranges[encoding]
+
+    def get_content(self, encoding=None):
+        offset, length = self._get_range(encoding)
+        return self.mapping[offset:offset + length]
+
+    def iter_content(self, chunk_size=64 * 1024, encoding=None):
+        start, length = self._get_range(encoding)
+        end = start + length
+        for offset in range(start, end, chunk_size):
+            yield self.mapping[offset:min(offset + chunk_size, end)]
+
+
+def hash_key(key):
+    return hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+
+
+class BaseSpecStore(object):
+    """
+    Storage for rendered specs, keyed by `SpecCache.make_key`.
+
+    `lock(key)` returns a context manager serializing the regeneration of an
+    entry, across processes for stores shared between them.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, spec):
+        raise NotImplementedError
+
+    def invalidate(self, config_name=None, version=None):
+        raise NotImplementedError
+
+    def lock(self, key):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class LocalMemorySpecStore(BaseSpecStore):
+    """
+    Keeps specs in the memory of the current process
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self._specs = {}
+
+    def get(self, key):
+        return self._specs.get(key)
+
+    def set(self, key, spec):
+        with self._lock:
+            self._specs[key] = spec
+
+    def invalidate(self, config_name=None, version=None):
+        """
+        Drops the entries matching `config_name` and/or `version`.
+        Drops everything when called without arguments.
+        """
+        with self._lock:
+            for key in list(self._specs):
+                if config_name is not None and key[0] != config_name:
+                    continue
+                if version is not None and key[1] != version:
+                    continue
+                del self._specs[key]
+
+    def lock(self, key):
+        with self._lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def __len__(self):
+        return len(self._specs)
+
+
+class DjangoCacheSpecStore(BaseSpecStore):
+    """
+    Keeps specs in one of the Django caches, shared by every process using it.
+
+    Entries cannot be enumerated, so their keys hold a random generation
+    token which invalidating replaces, dropping every entry at once. A token
+    evicted from the cache is replaced by a new one as well, never by an
+    older one, so entries of past generations cannot come back. Entries
+    expire after `timeout` seconds.
+    """
+
+    def __init__(self, alias='default', timeout=DEFAULT_SPEC_TIMEOUT, lock_timeout=60,
+                 key_prefix='swagger_spec'):
+        self.cache = get_cache(alias)
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.key_prefix = key_prefix
+
+    def _get_generation(self):
+        generation_key = self.key_prefix + ':generation'
+        generation = self.cache.get(generation_key)
+        if generation is None:
+            # the first process to add a token wins, the others read it back
+            self.cache.add(generation_key, uuid.uuid4().hex, self.timeout)
+            generation = self.cache.get(generation_key)
+        return generation
+
+    def _make_key(self, key):
+        return '{0}:{1}:{2}'.format(self.key_prefix, self._get_generation(), hash_key(key))
+
+    def get(self, key):
+        data = self.cache.get(self._make_key(key))
+        if data is None:
+            return None
+        return RenderedSpec(
+            content=data['content'],
+            etag=data['etag'],
+            last_modified=data['last_modified'],
+            encoded=data.get('encoded'))
+
+    def set(self, key, spec):
+        data = {
+            'content': bytes(spec.content),
+            'etag': spec.etag,
+            'last_modified': spec.last_modified,
+            'encoded': dict(
+                (encoding, bytes(spec.get_content(encoding))) for encoding in spec.encodings),
+        }
+        self.cache.set(self._make_key(key), data, self.timeout)
+
+    def invalidate(self, config_name=None, version=None):
+        self.cache.set(self.key_prefix + ':generation', uuid.uuid4().hex, self.timeout)
+
+    @contextmanager
+    def lock(self, key):
+        lock_key = self._make_key(key) + ':lock'
+        deadline = time.time() + self.lock_timeout
+        acquired = self.cache.add(lock_key, 1, self.lock_timeout)
+        while not acquired and time.time() < deadline:
+            time.sleep(0.1)
+            acquired = self.cache.add(lock_key, 1, self.lock_timeout)
+        try:
+            yield
+        finally:
+            if acquired:
+                self.cache.delete(lock_key)
+
+
+class MmapSpecStore(BaseSpecStore):
+    """
+    Keeps specs in files of a local directory, memory-mapped by every worker
+    of the host so their content lives once in the page cache.
+
+    Each file starts with a JSON header line holding the validators and the
+    position of the compressed variants, followed by the document and its
+    variants. Files are replaced atomically, so a mapping stays valid
+    until the worker notices the new file. Files older than `timeout`
+    seconds are ignored, then replaced.
+    """
+
+    def __init__(self, directory, timeout=DEFAULT_SPEC_TIMEOUT):
+        self.directory = directory
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._mappings = {}
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hash_key(key) + '.spec')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if self.timeout is not None and stat.st_mtime + self.timeout < time.time():
+            return None
+
+        identity = (stat.st_ino, stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._mappings.get(path)
+            if cached is not None and cached[0] == identity:
+                return cached[1]
+
+        try:
+            with open(path, 'rb') as spec_file:
+                mapping = mmap.mmap(spec_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return None
+
+        header_end = mapping.find(b'\n')
+        header = json.loads(mapping[:header_end].decode('utf-8'))
+        offset = header_end + 1
+        encoded = dict(
+            (encoding, (offset + start, length))
+            for encoding, (start, length) in header.get('encoded', {}).items()
+        )
+        spec = MappedSpec(
+            mapping, offset, header['etag'], header['last_modified'],
+            length=header.get('length'), encoded=encoded)
+        with self._lock:
+            self._mappings[path] = (identity, spec)
+        return spec
+
+    def set(self, key, spec):
+        path = self._path(key)
+        parts = [bytes(spec.content)]
+        encoded = {}
+        start = len(parts[0])
+        for encoding in spec.encodings:
+            parts.append(bytes(spec.get_content(encoding)))
+            encoded[encoding] = (start, len(parts[-1]))
+            start += len(parts[-1])
+
+        header = json.dumps({
+            'config_name': key[0],
+            'version': key[1],
+            'etag': spec.etag,
+            'last_modified': spec.last_modified,
+            'length': len(parts[0]),
+            'encoded': encoded,
+        }).encode('utf-8')
+        tmp_path = '{0}.{1}.{2}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+        with open(tmp_path, 'wb') as spec_file:
+            spec_file.write(header + b'\n')
+            for part in parts:
+                spec_file.write(part)
+        os.rename(tmp_path, path)
+
+    def invalidate(self, config_name=None, version=None):
+        for name in os.listdir(self.directory):
+            if not name.endswith('.spec'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'rb') as spec_file:
+                    header = json.loads(spec_file.readline().decode('utf-8'))
+                if config_name is not None and header['config_name'] != config_name:
+                    continue
+                if version is not None and header['version'] != version:
+                    continue
+                os.remove(path)
+            except (IOError, OSError, ValueError):
+                continue
+
+    @contextmanager
+    def lock(self, key):
+        with open(self._path(key) + '.lock', 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def __len__(self):
+        return len([name for name in os.listdir(self.directory) if name.endswith('.spec')])
+
+
+class SpecCache(object):
+    """
+    Stores the documents built by `DocumentationGenerator.get_root`, keyed by
+    `(swagger_config_name, version, urlconf, token)`.
+
+    The storage backend is chosen per config through the `spec_cache_backend`
+    and `spec_cache_options` settings. Entries are dropped explicitly through
+    `invalidate`/`clear`, or implicitly whenever the swagger settings change.
+    Stores may outlive the process, so the token of the keys identifies the
+    swagger settings and the release of the code: entries written by
+    another release or with other settings are never read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stores = {}
+        self._settings_fingerprint = self.get_settings_fingerprint()
+        self._key_tokens = {}
+        self._partial_specs = LRUCache(maxsize=PARTIAL_SPECS_MAXSIZE)
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, config_name, version, urlconf, subset=None):
+        """
+        `subset` holds the filters of a partial document, as keyword arguments
+        """
+        urlconf = getattr(urlconf, '__name__', urlconf)
+        key = (config_name or 'default', version, urlconf, self.get_key_token(urlconf))
+        if subset:
+            return key + (tuple(sorted(subset.items())),)
+        return key
+
+    @staticmethod
+    def get_settings_fingerprint():
+        values = [getattr(settings, name, None) for name in WATCHED_SETTINGS]
+        try:
+            return json.dumps(values, sort_keys=True, default=describe)
+        except (TypeError, ValueError):
+            return repr(values)
+
+    @staticmethod
+    def get_release(urlconf):
+        """
+        Returns the `spec_cache_release` global setting, meant to be set to
+        the revision being deployed, or else the modification time of the
+        urlconf module
+        """
+        from . import VERSION
+
+        release = get_global_setting('spec_cache_release')
+        if release is None:
+            filename = getattr(sys.modules.get(urlconf), '__file__', None)
+            try:
+                release = os.stat(filename).st_mtime if filename else None
+            except OSError:
+                pass
+        return '{0}:{1}'.format(VERSION, release)
+
+    def get_key_token(self, urlconf):
+        """
+        Hashes the swagger settings and the release, once per process and
+        settings
+        """
+        self._check_settings()
+        with self._lock:
+            token = self._key_tokens.get(urlconf)
+        if token is None:
+            token = hash_key((self._settings_fingerprint, self.get_release(urlconf)))[:16]
+            with self._lock:
+                self._key_tokens[urlconf] = token
+        return token
+
+    def get_store(self, config=None):
+        config = config or {}
+        backend = config.get('spec_cache_backend') or DEFAULT_SPEC_STORE
+        options = config.get('spec_cache_options') or {}
+        store_key = (backend, repr(sorted(options.items())))
+        with self._lock:
+            store = self._stores.get(store_key)
+            if store is None:
+                store = import_string(backend)(**options)
+                self._stores[store_key] = store
+        return store
+
+    def _check_settings(self):
+        """
+        Drops every entry if the swagger settings changed since the last lookup
+        """
+        fingerprint = self.get_settings_fingerprint()
+        if fingerprint != self._settings_fingerprint:
+            self._settings_fingerprint = fingerprint
+            with self._lock:
+                self._key_tokens = {}
+            self.invalidate()
+
+    @staticmethod
+    def is_partial(key):
+        return len(key) > 4
+
+    def get(self, key, config=None):
+        self._check_settings()
+        if self.is_partial(key):
+            spec = self._partial_specs.get(key)
+        else:
+            spec = self.get_store(config).get(key)
+        with self._lock:
+            if spec is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return spec
+
+    def set(self, key, document, config=None):
+        spec = RenderedSpec(document)
+        if config and config.get('compress_spec'):
+            spec.compress()
+        if self.is_partial(key):
+            self._partial_specs.set(key, spec)
+        else:
+            self.get_store(config).set(key, spec)
+        return spec
+
+    def get_or_build(self, key, build, config=None):
+        """
+        Returns the cached spec for `key`, calling `build()` to generate the
+        document on a miss. Concurrent misses on the same key build it once,
+        across processes for shared stores.
+        """
+        spec = self.get(key, config)
+        if spec is not None:
+            return spec
+        if self.is_partial(key):
+            # not worth a build lock per subset, concurrent misses build twice
+            return self.set(key, build(), config)
+
+        store = self.get_store(config)
+        with store.lock(key):
+            spec = store.get(key)
+            if spec is None:
+                spec = self.set(key, build(), config)
+        return spec
+
+    def invalidate(self, config_name=None, version=None):
+        """
+        Drops the entries matching `config_name` and/or `version`.
+        Drops everything when called without arguments.
+        """
+        with self._lock:
+            stores = list(self._stores.values())
+        for store in stores:
+            store.invalidate(config_name, version)
+        self._partial_specs.clear()
+
+    def clear(self):
+        self.invalidate()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            stores = list(self._stores.values())
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': sum(len(store) for store in stores) + len(self._partial_specs),
+        }
+
+
+spec_cache = SpecCache()
+
+
+def clear_endpoint_records():
+    """
+    Removes the files of the `endpoint_cache_dir` of every config
+    """
+    from .config import SwaggerConfig
+    from .endpointcache import EndpointRecordStore
+    from .spec import get_config_names
+
+    swagger_config = SwaggerConfig()
+    for config_name in get_config_names():
+        directory = swagger_config.get_config(config_name).get('endpoint_cache_dir')
+        if directory and os.path.isdir(directory):
+            EndpointRecordStore(directory).clear()
+
+
+def clear_all_caches():
+    """
+    Resets every cache of the generation: cached documents, URL index,
+    endpoint records, parsed docstrings, docstring class references, view
+    descriptions and markdown, summaries, ViewSet action maps, serializer
+    definitions and field types
+    """
+    from .docgenerator import clear_definitions_cache
+    from .fieldtypes import field_types
+    from .introspectors import clear_introspection_caches
+    from .urlparser import clear_url_index
+    from .utils import clear_view_description_cache
+    from .yamlparser import clear_class_cache, clear_docstring_cache
+
+    spec_cache.clear()
+    clear_url_index()
+    clear_endpoint_records()
+    clear_docstring_cache()
+    clear_class_cache()
+    clear_view_description_cache()
+    clear_introspection_caches()
+    clear_definitions_cache()
+    field_types.clear_cache()
+
+
+def clear_on_setting_changed(*args, **kwargs):
+    if kwargs['setting'] in RESET_SETTINGS:
+        clear_all_caches()
+
+
+setting_changed.connect(clear_on_setting_changed)
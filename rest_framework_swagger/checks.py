@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+System check resolving every class referenced by the YAML docstrings of the
+API, so broken references are reported together when the project starts
+rather than one at a time when the spec is generated. Resolved references
+are left in the class cache of the docstring parser.
+"""
+from django.core import checks
+from django.utils import six
+
+from .config import get_global_setting
+from .urlparser import get_url_index, get_urlconf
+
+REFERENCE_KEYS = ('serializer', 'request_serializer', 'response_serializer', 'view_mocker')
+
+
+def iter_references(parser):
+    """
+    Yields the (key, path) of the classes a parsed docstring refers to
+    """
+    for key in REFERENCE_KEYS:
+        value = parser.object.get(key, None)
+        if isinstance(value, six.string_types):
+            yield key, value
+    for parameter in parser.object.get('parameters', None) or []:
+        pytype = parameter.get('pytype', None) if isinstance(parameter, dict) else None
+        if isinstance(pytype, six.string_types):
+            yield 'pytype', pytype
+
+
+def find_broken_references(urlconf=None):
+    """
+    Returns a (path, method, key, reference, error) tuple for every
+    docstring reference of the API that cannot be resolved
+    """
+    from .docgenerator import DocumentationGenerator
+    from .yamlparser import resolve_class
+
+    endpoints = [entry._asdict() for entry in get_url_index(urlconf or get_urlconf())]
+    generator = DocumentationGenerator(config={})
+    generator.viewset_routes = generator.get_viewset_routes(endpoints)
+    broken = []
+    for endpoint in endpoints:
+        introspector = generator.get_introspector(endpoint)
+        for method_introspector in introspector:
+            method = method_introspector.method
+            try:
+                parser = method_introspector.get_yaml_parser()
+            except Exception as e:
+                broken.append((endpoint['path'], method, None, None, e))
+                continue
+            calling_module = method_introspector.get_module()
+            for key, reference in iter_references(parser):
+                try:
+                    if resolve_class(reference, calling_module) is None:
+                        raise Exception("Could not find %s" % reference)
+                except Exception as e:
+                    broken.append((endpoint['path'], method, key, reference, e))
+    return broken
+
+
+def check_docstring_references(app_configs=None, **kwargs):
+    try:
+        if not get_global_setting('check_references', True):
+            return []
+        broken = find_broken_references()
+    except Exception as e:
+        return [checks.Warning(
+            "Could not check the docstring references of the API: {}".format(e),
+            id='rest_framework_swagger.W002',
+        )]
+
+    messages = []
+    for path, method, key, reference, error in broken:
+        if key is None:
+            msg = "Docstring of {} {} cannot be read: {}".format(method, path, error)
+        else:
+            msg = "Docstring of {} {} refers to {} `{}`: {}".format(
+                method, path, key, reference, error)
+        messages.append(checks.Warning(msg, id='rest_framework_swagger.W001'))
+    return messages
@@ -62,6 +62,19 @@ except ImportError:
                                        % (module, attr))
         return view
 
+try:
+    from django.core.cache import caches
+except ImportError:
+    # Django < 1.7
+    caches = None
+
+
+def get_cache(alias):
+    if caches is None:
+        from django.core.cache import get_cache as get_django_cache
+        return get_django_cache(alias)
+    return caches[alias]
+
 
 def get_pagination_attribures(view):
     if StrictVersion(rest_framework.VERSION) >= StrictVersion('3.1.0'):
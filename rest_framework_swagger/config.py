@@ -11,18 +11,39 @@ class SwaggerConfig(object):
         'include_module_paths': [],
         'is_authenticated': False,
         'is_superuser': False,
-        'base_path': ''
+        'base_path': '',
+        'cache_spec': False,
+        'compress_spec': False,
+        'spec_cache_backend': 'rest_framework_swagger.cache.LocalMemorySpecStore',
+        'spec_cache_options': {},
+        'versions': [],
+        'precomputed_spec_dir': None,
+        'introspection_workers': 0,
+        'profile_generation': False,
+        'stream_spec': False,
+        'prune_definitions': False,
+        'endpoint_cache_dir': None,
+        'warmup_spec_cache': False,
     }
 
     def __init__(self):
         super(SwaggerConfig, self).__init__()
         self.global_settings = self.DEFAULT_SWAGGER_SETTINGS.copy()
-        self.global_settings.update(settings.SWAGGER_GLOBAL_SETTINGS)
+        self.global_settings.update(getattr(settings, 'SWAGGER_GLOBAL_SETTINGS', {}))
 
     def get_config(self, config_name=None):
         config_name = config_name or "default"
-        if config_name not in settings.SWAGGER_LOCAL_SETTINGS:
+        local_settings = getattr(settings, 'SWAGGER_LOCAL_SETTINGS', {})
+        if config_name not in local_settings:
             raise Exception("{} swagger settings not defined".format(config_name))
         current_config = self.global_settings.copy()
-        current_config.update(settings.SWAGGER_LOCAL_SETTINGS[config_name])
+        current_config.update(local_settings[config_name])
         return current_config
+
+
+def get_global_setting(name, default=None):
+    """
+    Reads a project wide setting, like those of startup, which no config
+    can override
+    """
+    return getattr(settings, 'SWAGGER_GLOBAL_SETTINGS', {}).get(name, default)
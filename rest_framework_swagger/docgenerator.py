@@ -1,85 +1,289 @@
 """Generates API documentation by introspection."""
+import copy
+import inspect
+import logging
+import threading
+from collections import namedtuple
+
 from django.contrib.auth.models import AnonymousUser
+from django.utils import six
 import rest_framework
 
 from rest_framework import viewsets, mixins
 from rest_framework.generics import GenericAPIView
 
 from rest_framework.serializers import BaseSerializer, ListField
+try:
+    from concurrent import futures
+except ImportError:
+    futures = None
 
 from .introspectors import (
     APIViewIntrospector,
     GenericViewIntrospector,
     BaseMethodIntrospector,
+    ViewFactory,
     ViewSetIntrospector,
+    ViewSetRoutes,
     WrappedAPIViewIntrospector,
     get_data_type,
 )
 from .compat import OrderedDict
-from .utils import extract_base_path, get_serializer_name, get_default_value
+from .endpointcache import EndpointRecordStore
+from .profiling import activate_profile, get_active_profile, timed
+from .urlparser import group_viewset_patterns
+from .utils import (extract_base_path, get_serializer_name, get_default_value,
+                    get_reachable_definitions, WeakClassCache)
 
+logger = logging.getLogger(__name__)
+
+# Swagger models of serializer classes, and the serializer classes nested in
+# their fields. Shared by every generator, across configs and requests, and
+# copied into documents.
+definitions_cache = WeakClassCache()
+nested_serializers_cache = WeakClassCache()
+
+
+def clear_definitions_cache():
+    definitions_cache.clear()
+    nested_serializers_cache.clear()
 
-class DocumentationGenerator(object):
-    # Serializers defined in docstrings
-    explicit_serializers = set()
 
-    # Serializers defined in fields
-    fields_serializers = set()
+# Everything the documentation needs from a single endpoint, gathered in one
+# introspection pass:
+# path -- the endpoint path, stripped of the base path
+# path_item -- the swagger path item, False when no operation is documented
+# serializers -- the request/response and extra serializers of every method
+# explicit_serializers -- the body serializers registered by its operations
+# response_types -- the response classes registered by its operations
+EndpointRecord = namedtuple('EndpointRecord', [
+    'path', 'path_item', 'serializers', 'explicit_serializers', 'response_types'])
 
-    # Response classes defined in docstrings
-    explicit_response_types = dict()
 
-    def __init__(self, for_user=None, config=None, request=None, config_name=None):
+class DocumentationGenerator(object):
+
+    def __init__(self, for_user=None, config=None, request=None, config_name=None, version=None,
+                 tags=None, path_prefix=None):
         self.config = config
         self.config_name = config_name
         self.user = for_user or AnonymousUser()
         self.request = request
+        self.version = version
+        # restrict the document to the operations tagged with one of `tags`
+        # and/or to the paths starting with `path_prefix`
+        self.tags = frozenset(tags) if tags else None
+        self.path_prefix = path_prefix
+        self._local = threading.local()
+        self.profile = get_active_profile()
+        self.default_payload_definition_name = None
+        self.default_payload_definition = None
+        self.record_store = None
+        self.reset_registries()
+
+    def reset_registries(self):
+        """
+        Registries filled while generating a document. They are scoped to a
+        single generation so nothing leaks between requests or configs.
+        """
+        # Serializers defined in docstrings
+        self.explicit_serializers = set()
+
+        # Response classes defined in docstrings
+        self.explicit_response_types = dict()
+
+        # View instances shared by the introspectors
+        self.view_factory = ViewFactory()
+
+        # Routes of every ViewSet class, introspected together
+        self.viewset_routes = {}
+
+    def _get_registries(self):
+        """
+        Returns the `(explicit_serializers, explicit_response_types)`
+        registries of the endpoint the current thread is introspecting, or
+        the generator-wide ones outside of `introspect_endpoint`
+        """
+        registries = getattr(self._local, 'registries', None)
+        if registries is None:
+            return self.explicit_serializers, self.explicit_response_types
+        return registries
+
+    def get_version(self):
+        if self.version is None:
+            return self.request.parser_context['kwargs']['version']
+        return self.version
 
     def get_root(self, endpoints_conf):
+        records = self.prepare_root(endpoints_conf)
+        return dict(self.iter_root_items(records))
+
+    def iter_root(self, endpoints_conf):
+        """
+        Yields the (key, value) pairs of the document returned by get_root,
+        the values of `paths` and `definitions` being iterators of
+        (name, value) pairs, so the document can be rendered one item at a
+        time. Endpoints are introspected on the first iteration, keeping
+        every path item, and the definitions are all built when `definitions`
+        is iterated: only the rendering of the whole document is avoided.
+        """
+        records = self.prepare_root(endpoints_conf)
+        for item in self.iter_root_items(records, lazy=True):
+            yield item
+
+    @property
+    def is_partial(self):
+        return bool(self.tags or self.path_prefix)
+
+    def prepare_root(self, endpoints_conf):
+        """
+        Resets the generator and returns the records of the introspected
+        endpoints. Endpoints outside of `path_prefix` are not introspected.
+        """
+        self.reset_registries()
         self.default_payload_definition_name = self.config.get("default_payload_definition_name", None)
         self.default_payload_definition = self.config.get("default_payload_definition", None)
         if self.default_payload_definition:
             self.explicit_response_types.update({
                 self.default_payload_definition_name: self.default_payload_definition
             })
-        return {
-            'swagger': '2.0',
-            'info': self.config.get('info', {
-                'contact': '',
-            }),
-            'basePath': self.config.get("basePath", '').format(
-                version=self.request.parser_context['kwargs']['version']
-            ),
-            'host': self.config.get('host', ''),
-            'schemes': self.config.get('schemes', ''),
-            'paths': self.get_paths(endpoints_conf),
-            'definitions': self.get_definitions(endpoints_conf),
-            'securityDefinitions': self.config.get('securityDefinitions', {})
-        }
+        # endpoints introspected by previous runs, see endpointcache
+        if self.config.get('endpoint_cache_dir'):
+            self.record_store = EndpointRecordStore(self.config['endpoint_cache_dir'])
+        all_endpoints = endpoints_conf
+        if self.path_prefix:
+            endpoints_conf = [
+                endpoint for endpoint in endpoints_conf
+                if self.in_path_prefix(self.strip_base_path(endpoint['path']))
+            ]
+        return self.introspect_endpoints(endpoints_conf, all_endpoints)
+
+    def in_path_prefix(self, path):
+        """
+        Tells whether `path` is `path_prefix` or below it, segment-wise
+        """
+        return (path == self.path_prefix or
+                path.startswith(self.path_prefix.rstrip('/') + '/'))
+
+    def strip_base_path(self, path):
+        # remove the base_path from the begining of the path
+        return extract_base_path(path=path, base_path=self.config.get('basePath'))
+
+    def iter_root_items(self, records, lazy=False):
+        yield 'swagger', '2.0'
+        yield 'info', self.config.get('info', {
+            'contact': '',
+        })
+        yield 'basePath', self.config.get("basePath", '').format(
+            version=self.get_version()
+        )
+        yield 'host', self.config.get('host', '')
+        yield 'schemes', self.config.get('schemes', '')
+        if lazy:
+            yield 'paths', self.iter_paths(records)
+            yield 'definitions', self.iter_definitions(records)
+        else:
+            yield 'paths', self.build_paths(records)
+            yield 'definitions', self.build_definitions(records)
+        yield 'securityDefinitions', self.config.get('securityDefinitions', {})
+
+    def introspect_endpoints(self, endpoints_conf, all_endpoints=None):
+        """
+        Introspects endpoints, over a thread pool of `introspection_workers`
+        threads when configured. Records come back in endpoint order either
+        way, so the generated document does not depend on the mode. Parsing
+        YAML docstrings holds the GIL, so threads bring no speedup on CPython.
+        The routes of a ViewSet are introspected together with its other
+        routes among `all_endpoints`, `endpoints_conf` by default.
+        """
+        self.viewset_routes = self.get_viewset_routes(
+            endpoints_conf if all_endpoints is None else all_endpoints)
+
+        workers = self.config.get('introspection_workers') or 0
+        if workers > 1 and futures is None:
+            logger.warning("introspection_workers requires concurrent.futures, "
+                           "introspecting endpoints serially")
+            workers = 0
+
+        if workers > 1:
+            with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(self.introspect_endpoint, endpoints_conf))
+        return [self.introspect_endpoint(endpoint) for endpoint in endpoints_conf]
+
+    def introspect_endpoint(self, endpoint):
+        """
+        Introspects an endpoint once and returns an `EndpointRecord` from
+        which both its path item and its definitions are built
+        """
+        path = self.strip_base_path(endpoint['path'])
+        endpoint = dict(endpoint, path=path)
+
+        if self.record_store is None:
+            return self._introspect_endpoint(endpoint)
+
+        record = self.record_store.get(self, endpoint)
+        if record is None:
+            record = self._introspect_endpoint(endpoint)
+            self.record_store.set(self, endpoint, record)
+        return record
+
+    def _introspect_endpoint(self, endpoint):
+        path = endpoint['path']
+        explicit_serializers, response_types = set(), OrderedDict()
+        self._local.registries = (explicit_serializers, response_types)
+        try:
+            with activate_profile(self.profile, endpoint=path), timed('introspection'):
+                introspector = self.get_introspector(endpoint)
+                all_method_introspectors = list(introspector)
+                method_introspectors = self.get_method_introspectors(endpoint, all_method_introspectors)
+
+                path_item = self.get_path_item(endpoint, introspector, method_introspectors)
+                serializers = set()
+                # partial documents skip the serializers of the filtered out endpoints
+                if path_item or not self.is_partial:
+                    serializers = self._get_method_serializer_set(all_method_introspectors)
+
+                return EndpointRecord(
+                    path=path,
+                    path_item=path_item,
+                    serializers=serializers,
+                    explicit_serializers=explicit_serializers,
+                    response_types=response_types,
+                )
+        finally:
+            self._local.registries = None
 
     def get_paths(self, endpoints_conf):
+        return self.build_paths(self.introspect_endpoints(endpoints_conf))
+
+    def build_paths(self, records):
+        with timed('paths'):
+            return OrderedDict(self.iter_paths(records))
+
+    def iter_paths(self, records):
+        """
+        Yields the (path, path item) pairs of build_paths, in order
+        """
         paths_dict = {}
-        for endpoint in endpoints_conf:
-            # remove the base_path from the begining of the path
-            endpoint['path'] = extract_base_path(path=endpoint['path'], base_path=self.config.get('basePath'))
-            path_item = self.get_path_item(endpoint)
-            if path_item:
-                paths_dict[endpoint['path']] = path_item
+        for record in records:
+            if record.path_item:
+                paths_dict[record.path] = record.path_item
 
-        paths_dict = OrderedDict(sorted(paths_dict.items()))
-        return paths_dict
+        for path in sorted(paths_dict):
+            yield path, paths_dict[path]
 
-    def get_path_item(self, api_endpoint):
-        introspector = self.get_introspector(api_endpoint)
+    def get_path_item(self, api_endpoint, introspector=None, method_introspectors=None):
+        if introspector is None:
+            introspector = self.get_introspector(api_endpoint)
+        if method_introspectors is None:
+            method_introspectors = self.get_method_introspectors(api_endpoint, introspector)
 
         path_item = {}
 
-        for operation in self.get_operations(api_endpoint, introspector):
+        for operation in self.get_operations(api_endpoint, introspector, method_introspectors):
             path_item[operation.pop('method').lower()] = operation
         if not path_item:
             return False
 
-        method_introspectors = self.get_method_introspectors(api_endpoint, introspector)
         # we get the main parameters (common to all operations) from the first view operation
         # only path parameters are commont to all operations
         path_item['parameters'] = method_introspectors[0].build_path_parameters()
@@ -91,19 +295,25 @@ class DocumentationGenerator(object):
                 isinstance(method_introspector, BaseMethodIntrospector)
                 and not method_introspector.get_http_method() == "OPTIONS"]
 
-    def get_operations(self, api_endpoint, introspector):
+    def get_operations(self, api_endpoint, introspector, method_introspectors=None):
         """
         Returns docs for the allowed methods of an API endpoint
         """
         operations = []
+        if method_introspectors is None:
+            method_introspectors = self.get_method_introspectors(api_endpoint, introspector)
 
-        for method_introspector in self.get_method_introspectors(api_endpoint, introspector):
+        for method_introspector in method_introspectors:
             doc_parser = method_introspector.get_yaml_parser()
             # check if operation is allowed on the current swagger config name
             operation_config_name = doc_parser.get_param(param_name='swagger_config_name', default=False)
             if operation_config_name and operation_config_name != self.config_name:
                 continue
 
+            operation_tags = doc_parser.get_param(param_name='tags', default=[])
+            if self.tags and not self._has_tag(operation_tags):
+                continue
+
             serializer = self._get_method_serializer(method_introspector)
 
             operation_method = method_introspector.get_http_method()
@@ -114,7 +324,7 @@ class DocumentationGenerator(object):
                 'summary': method_introspector.get_summary(),
                 'operationId': method_introspector.get_operation_id(),
                 'produces': doc_parser.get_param(param_name='produces', default=self.config.get('produces')),
-                'tags': doc_parser.get_param(param_name='tags', default=[]),
+                'tags': operation_tags,
                 'parameters': self._get_operation_parameters(method_introspector, operation_method)
             }
 
@@ -147,6 +357,11 @@ class DocumentationGenerator(object):
 
         return operations
 
+    def _has_tag(self, operation_tags):
+        if isinstance(operation_tags, six.string_types):
+            operation_tags = [operation_tags]
+        return not self.tags.isdisjoint(operation_tags or [])
+
     def _get_operation_success_response(self, doc_parser, serializer, introspector, method_introspector):
         response_type = self._get_method_response_type(doc_parser, serializer, introspector, method_introspector)
         operation_method = method_introspector.get_http_method().lower()
@@ -181,7 +396,7 @@ class DocumentationGenerator(object):
         parameters = []
         if (method in ('POST', 'PUT', 'PATCH') and hasattr(serializer, "Meta")
            and hasattr(serializer.Meta, "_in") and serializer.Meta._in == "body"):
-            self.explicit_serializers.add(serializer)
+            self._get_registries()[0].add(serializer)
             parameters.append(introspector.build_body_parameters())
 
         parameters.extend(
@@ -193,15 +408,25 @@ class DocumentationGenerator(object):
         path = api['path']
         pattern = api['pattern']
         callback = api['callback']
+        view_factory = self.view_factory
         if callback.__module__ == 'rest_framework.decorators':
-            return WrappedAPIViewIntrospector(callback, path, pattern, self.user)
+            return WrappedAPIViewIntrospector(callback, path, pattern, self.user, view_factory)
         elif issubclass(callback, viewsets.ViewSetMixin):
             patterns = [api['pattern']]
-            return ViewSetIntrospector(callback, path, pattern, self.user, patterns=patterns)
+            return ViewSetIntrospector(callback, path, pattern, self.user, patterns=patterns,
+                                       view_factory=view_factory,
+                                       routes=self.viewset_routes.get(callback))
         elif issubclass(callback, GenericAPIView) and self._callback_generic_is_implemented(callback):
-            return GenericViewIntrospector(callback, path, pattern, self.user)
+            return GenericViewIntrospector(callback, path, pattern, self.user, view_factory)
         else:
-            return APIViewIntrospector(callback, path, pattern, self.user)
+            return APIViewIntrospector(callback, path, pattern, self.user, view_factory)
+
+    @staticmethod
+    def get_viewset_routes(endpoints_conf):
+        return dict(
+            (callback, ViewSetRoutes(callback, patterns))
+            for callback, patterns in group_viewset_patterns(endpoints_conf).items()
+        )
 
     def _callback_generic_is_implemented(self, callback):
         """
@@ -216,19 +441,37 @@ class DocumentationGenerator(object):
                 issubclass(callback, mixins.DestroyModelMixin))
 
     def get_definitions(self, endpoints_conf):
+        return self.build_definitions(self.introspect_endpoints(endpoints_conf))
+
+    def build_definitions(self, records):
         """
         Builds a list of Swagger 'models'. These represent
         DRF serializers and their fields
         """
-        serializers = self._get_serializer_set(endpoints_conf)
-        serializers.update(self.explicit_serializers)
+        with timed('definitions'):
+            return self._build_definitions(records)
+
+    def iter_definitions(self, records):
+        """
+        Yields the (name, definition) pairs of build_definitions, in order
+        """
+        for item in self._build_definitions(records).items():
+            yield item
+
+    def _build_definitions(self, records):
+        serializers = set(self.explicit_serializers)
+        response_types = OrderedDict(self.explicit_response_types)
+        for record in records:
+            serializers.update(record.serializers)
+            serializers.update(record.explicit_serializers)
+            response_types.update(record.response_types)
         serializers.update(
             self._find_field_serializers(serializers)
         )
 
         models = {}
 
-        for serializer in serializers:
+        for serializer in sorted(serializers, key=self._serializer_sort_key):
             serializer_name = get_serializer_name(serializer)
 
             if hasattr(serializer, "Meta") and hasattr(serializer.Meta, "child"):
@@ -238,15 +481,38 @@ class DocumentationGenerator(object):
 
             models[serializer_name] = self.get_definition(serializer)
 
-        models.update(self.explicit_response_types)
-        models.update(self.fields_serializers)
+        models.update(response_types)
+        models = OrderedDict(sorted(models.items()))
+        # drop the definitions no operation references, always for partial documents
+        if self.is_partial or self.config.get('prune_definitions'):
+            models = get_reachable_definitions(
+                models, [record.path_item for record in records if record.path_item])
         return models
 
+    @staticmethod
+    def _serializer_sort_key(serializer):
+        """
+        Orders serializers deterministically, so that definitions sharing a
+        name resolve the same way on every run
+        """
+        cls = serializer if inspect.isclass(serializer) else serializer.__class__
+        return (get_serializer_name(serializer), cls.__module__, cls.__name__)
+
     def get_definition(self, serializer):
         """
         :param serializer: Serializer to describe
-        :type serializer: serializer instance
+        :type serializer: serializer class or instance
+
+        Definitions of serializer classes are compiled once per process.
+        Every document gets its own copy, so changing it leaves the cache and
+        the other documents alone.
         """
+        if inspect.isclass(serializer):
+            return copy.deepcopy(
+                definitions_cache.get_or_set(serializer, self._compile_definition))
+        return self._compile_definition(serializer)
+
+    def _compile_definition(self, serializer):
         data = self._get_serializer_fields(serializer)
         serializer_type = "object"
         properties = OrderedDict((k, v) for k, v in data['fields'].items()
@@ -278,17 +544,24 @@ class DocumentationGenerator(object):
         of APIs
         """
         serializers = set()
+        for record in self.introspect_endpoints(endpoints_conf):
+            serializers.update(record.serializers)
+        return serializers
 
-        for endpoint in endpoints_conf:
-            introspector = self.get_introspector(endpoint)
-            for method_introspector in introspector:
-                serializer = self._get_method_serializer(method_introspector)
-                if serializer is not None:
-                    serializers.add(serializer)
-                extras = method_introspector.get_extra_serializer_classes()
-                for extra in extras:
-                    if extra is not None:
-                        serializers.add(extra)
+    def _get_method_serializer_set(self, method_introspectors):
+        """
+        Returns a set of serializer classes for the methods of an API
+        """
+        serializers = set()
+
+        for method_introspector in method_introspectors:
+            serializer = self._get_method_serializer(method_introspector)
+            if serializer is not None:
+                serializers.add(serializer)
+            extras = method_introspector.get_extra_serializer_classes()
+            for extra in extras:
+                if extra is not None:
+                    serializers.add(extra)
 
         return serializers
 
@@ -334,7 +607,7 @@ class DocumentationGenerator(object):
                 view=view_name,
                 method=method_inspector.method.title().replace('_', '')
             )
-            self.explicit_response_types.update({
+            self._get_registries()[1].update({
                 response_type_name: {
                     "id": response_type_name,
                     "properties": response_type
@@ -348,30 +621,41 @@ class DocumentationGenerator(object):
 
             return 'object'
 
-    def _find_field_serializers(self, serializers, found_serializers=set()):
+    def _find_field_serializers(self, serializers, found_serializers=None):
         """
-        Returns set of serializers discovered from fields
+        Returns set of serializer classes discovered from fields, walking
+        every nested serializer once
         """
-        def get_thing(field, key):
+        if found_serializers is None:
+            found_serializers = set()
+
+        pending = list(serializers)
+        while pending:
+            serializer = pending.pop()
+            for nested in nested_serializers_cache.get_or_set(
+                    serializer, self._get_nested_serializers):
+                if nested not in found_serializers:
+                    found_serializers.add(nested)
+                    pending.append(nested)
+
+        return found_serializers
+
+    @staticmethod
+    def _get_nested_serializers(serializer):
+        """
+        Returns the serializer classes used by the fields of a serializer
+        """
+        def get_class(field):
             if rest_framework.VERSION >= '3.0.0':
                 from rest_framework.serializers import ListSerializer
                 if isinstance(field, ListSerializer):
-                    return key(field.child)
-            return key(field)
+                    return field.child.__class__
+            return field.__class__
 
-        serializers_set = set()
-        for serializer in serializers:
-            fields = serializer().get_fields()
-            for name, field in fields.items():
-                if isinstance(field, BaseSerializer):
-                    serializers_set.add(get_thing(field, lambda f: f))
-                    if field not in found_serializers:
-                        serializers_set.update(
-                            self._find_field_serializers(
-                                (get_thing(field, lambda f: f.__class__),),
-                                serializers_set))
-
-        return serializers_set
+        return tuple(
+            get_class(field) for field in serializer().get_fields().values()
+            if isinstance(field, BaseSerializer)
+        )
 
     def _get_serializer_fields(self, serializer):
         """
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of the introspection of single endpoints, for development.
+
+The development server restarts on every code change, so nothing kept in
+memory survives an edit. `EndpointRecordStore` keeps the `EndpointRecord` of
+every endpoint in a directory instead, along with the modification times of
+the modules it was built from: the module of the view and of its bases, or
+of the function of an `@api_view`, and the modules of its serializers. After
+a restart, only the endpoints whose modules changed are introspected again;
+the others are read back and merged into the new document.
+"""
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .compat import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+
+class Uncacheable(Exception):
+    """
+    Raised when a record refers to something that cannot be stored,
+    like a serializer instance or a class defined outside of a module file
+    """
+
+
+def get_class_path(cls):
+    if not inspect.isclass(cls):
+        raise Uncacheable(repr(cls))
+    module = sys.modules.get(cls.__module__)
+    if getattr(module, cls.__name__, None) is not cls:
+        raise Uncacheable(repr(cls))
+    return '{0}.{1}'.format(cls.__module__, cls.__name__)
+
+
+def load_class(path):
+    module_path, class_name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_path), class_name)
+
+
+def get_module_file(module_name):
+    filename = getattr(sys.modules.get(module_name), '__file__', None)
+    if not filename:
+        raise Uncacheable(module_name)
+    if filename.endswith(('.pyc', '.pyo')):
+        filename = filename[:-1]
+    return filename
+
+
+def describe(obj):
+    """
+    Describes the objects of a config by their dotted path rather than by a
+    repr which changes on every run
+    """
+    if hasattr(obj, '__module__') and hasattr(obj, '__name__'):
+        return '{0}.{1}'.format(obj.__module__, obj.__name__)
+    return repr(obj)
+
+
+class EndpointRecordStore(object):
+    """
+    Keeps endpoint records in files of `directory`, one per endpoint and
+    generation settings. Module modification times are looked up once per
+    store, so a store should not outlive a generation.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._mtimes = {}
+        self._lock = threading.Lock()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def get_mtime(self, module_name):
+        """
+        Returns the modification time of a module, looked up once per store
+        """
+        with self._lock:
+            if module_name in self._mtimes:
+                return self._mtimes[module_name]
+        mtime = os.stat(get_module_file(module_name)).st_mtime
+        with self._lock:
+            self._mtimes[module_name] = mtime
+        return mtime
+
+    def make_key(self, generator, endpoint):
+        from . import VERSION
+
+        callback = endpoint['callback']
+        key = json.dumps([
+            FORMAT_VERSION,
+            VERSION,
+            generator.config_name,
+            generator.get_version(),
+            sorted(generator.tags or []),
+            generator.path_prefix,
+            endpoint['path'],
+            endpoint['pattern'].regex.pattern,
+            '{0}.{1}'.format(callback.__module__, getattr(callback, '__name__', '')),
+            generator.config,
+        ], sort_keys=True, default=describe)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.json')
+
+    def get_modules(self, generator, endpoint, record):
+        """
+        Returns the names of the modules the record was built from
+        """
+        from .decorators import wrapper_to_func
+
+        callback = endpoint['callback']
+        classes = list(inspect.getmro(callback)) if inspect.isclass(callback) else [callback]
+        if callback.__module__ == 'rest_framework.decorators':
+            # the function wrapped by @api_view, holding the code and docstring
+            classes.append(wrapper_to_func(callback))
+        serializers = set(record.serializers) | set(record.explicit_serializers)
+        classes.extend(serializers)
+        classes.extend(generator._find_field_serializers(serializers))
+        return sorted(set(
+            cls.__module__ for cls in classes
+            if cls.__module__ not in ('__builtin__', 'builtins')
+        ))
+
+    def get(self, generator, endpoint):
+        """
+        Returns the stored record of an endpoint, or None when there is none
+        or when one of its modules changed since it was stored
+        """
+        from .docgenerator import EndpointRecord
+
+        path = self._path(self.make_key(generator, endpoint))
+        try:
+            with open(path) as record_file:
+                data = json.load(record_file, object_pairs_hook=OrderedDict)
+            for module_name, mtime in data['modules'].items():
+                if self.get_mtime(module_name) != mtime:
+                    return None
+            return EndpointRecord(
+                path=data['path'],
+                path_item=data['path_item'],
+                serializers=set(load_class(cls) for cls in data['serializers']),
+                explicit_serializers=set(load_class(cls) for cls in data['explicit_serializers']),
+                response_types=data['response_types'],
+            )
+        except (IOError, OSError, ValueError, KeyError, ImportError, AttributeError, Uncacheable):
+            return None
+
+    def set(self, generator, endpoint, record):
+        """
+        Stores the record of an endpoint, unless it cannot be read back
+        """
+        try:
+            data = {
+                'path': record.path,
+                'path_item': record.path_item,
+                'serializers': sorted(get_class_path(cls) for cls in record.serializers),
+                'explicit_serializers': sorted(
+                    get_class_path(cls) for cls in record.explicit_serializers),
+                'response_types': record.response_types,
+                'modules': dict(
+                    (module_name, self.get_mtime(module_name))
+                    for module_name in self.get_modules(generator, endpoint, record)
+                ),
+            }
+            content = json.dumps(data, cls=JSONEncoder)
+        except (OSError, TypeError, ValueError, Uncacheable) as exc:
+            logger.debug("Endpoint %s cannot be cached: %s", record.path, exc)
+            return
+
+        path = self._path(self.make_key(generator, endpoint))
+        tmp_path = '{0}.{1}.{2}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+        with open(tmp_path, 'w') as record_file:
+            record_file.write(content)
+        os.rename(tmp_path, path)
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Swagger types of serializer fields.
+
+`FieldTypeRegistry` maps field classes to their swagger (type, format). A
+field gets the type registered for the nearest class of its MRO, looked up
+once per field class. Types depending on the field instance, like those of
+choice fields, are registered as functions of the field.
+
+Projects register their own field classes on the default registry:
+
+    from rest_framework_swagger.fieldtypes import register_field_type
+    register_field_type(MoneyField, 'number', 'double')
+    register_field_type(JSONBField, 'object')
+
+Registering drops the cached definitions and documents built before.
+"""
+import threading
+
+from rest_framework import fields
+
+from .utils import WeakClassCache
+
+DEFAULT_TYPE = ('string', 'string')
+
+
+def get_choice_type(field):
+    choices = field.choices
+    if isinstance(choices, dict):
+        keys = iter(choices)
+    else:
+        # a list of (key, label) pairs before REST Framework 3
+        keys = (choice[0] for choice in choices)
+    if isinstance(next(keys, None), int):
+        return 'integer', 'int64'
+    return 'string', 'string'
+
+
+def get_model_field_type(field):
+    if field.model_field.__class__.__name__ == "JSONField":
+        return 'object', 'object'
+    return DEFAULT_TYPE
+
+
+class FieldTypeRegistry(object):
+    """
+    Swagger (type, format) of serializer field classes and their subclasses
+    """
+
+    def __init__(self):
+        self._types = {}
+        self._lock = threading.Lock()
+        self._resolved = WeakClassCache()
+
+    def register(self, field_class, data_type, data_format=None):
+        """
+        Registers the (type, format) of `field_class` and of its subclasses,
+        `data_type` being either the swagger type or a function returning the
+        (type, format) of a field instance
+        """
+        self._set(field_class, data_type, data_format)
+        self.changed()
+
+    def unregister(self, field_class):
+        with self._lock:
+            self._types.pop(field_class, None)
+        self.changed()
+
+    def _set(self, field_class, data_type, data_format=None):
+        if callable(data_type):
+            value = data_type
+        else:
+            value = (data_type, data_format or data_type)
+        with self._lock:
+            self._types[field_class] = value
+        self._resolved.clear()
+
+    def clear_cache(self):
+        self._resolved.clear()
+
+    def changed(self):
+        """
+        Drops what was built from the previous types: the definitions of
+        serializers and the cached documents
+        """
+        from .cache import spec_cache
+        from .docgenerator import clear_definitions_cache
+
+        self._resolved.clear()
+        clear_definitions_cache()
+        spec_cache.invalidate()
+
+    def resolve(self, field_class):
+        """
+        Returns the (type, format), or function of the field, for `field_class`
+        """
+        with self._lock:
+            types = self._types
+            if field_class in types:
+                return types[field_class]
+            # third party JSON fields, known by name only
+            if field_class.__name__ == "JSONField":
+                return 'object', 'object'
+            for cls in field_class.__mro__[1:]:
+                if cls in types:
+                    return types[cls]
+        return DEFAULT_TYPE
+
+    def get_data_type(self, field):
+        data_type = self._resolved.get_or_set(field.__class__, self.resolve)
+        if callable(data_type):
+            return data_type(field)
+        return data_type
+
+
+def register_default_types(registry):
+    # nothing was built yet, no cache to drop
+    registry._set(fields.BooleanField, 'boolean')
+    registry._set(fields.ChoiceField, get_choice_type)
+    registry._set(fields.DateField, 'string', 'date')
+    registry._set(fields.DateTimeField, 'string', 'date-time')
+    registry._set(fields.IntegerField, 'integer', 'int64')
+    registry._set(fields.FloatField, 'number', 'float')
+    # fields missing from some versions of REST Framework
+    optional_fields = (
+        ('DictField', 'object'),
+        ('ListField', 'array'),
+        ('NullBooleanField', 'boolean'),
+        ('HiddenField', 'hidden'),
+        ('ModelField', get_model_field_type),
+    )
+    for name, data_type in optional_fields:
+        field_class = getattr(fields, name, None)
+        if field_class is not None:
+            registry._set(field_class, data_type)
+
+
+field_types = FieldTypeRegistry()
+register_default_types(field_types)
+
+
+def register_field_type(field_class, data_type, data_format=None):
+    field_types.register(field_class, data_type, data_format)
@@ -2,22 +2,26 @@
 
 """Handles the instrospection of REST Framework Views and ViewSets."""
 
+import copy
 import itertools
 import re
 import logging
+import threading
+import weakref
 
 from .compat import strip_tags, get_pagination_attribures
 from .yamlparser import YAMLDocstringParser
 from .constants import INTROSPECTOR_ENUMS, INTROSPECTOR_PRIMITIVES
+from .fieldtypes import field_types
 from .utils import (normalize_data_format, get_view_description,
-                    do_markdown, get_serializer_name)
+                    do_markdown, get_serializer_name, uses_default_view_description,
+                    LRUCache)
 from abc import ABCMeta, abstractmethod
 
 from django.http import HttpRequest
 from django.contrib.admindocs.utils import trim_docstring
 from django.utils.encoding import smart_text
 
-import rest_framework
 from rest_framework import viewsets
 from rest_framework.utils import formatting
 from rest_framework.mixins import ListModelMixin
@@ -28,6 +32,27 @@ except ImportError:
 
 logger = logging.getLogger()
 
+# Marks memoized values that have not been computed yet
+_unset = object()
+
+# Summaries and descriptions, keyed by the docstrings they are made of
+text_cache = LRUCache(maxsize=4096)
+
+# Action maps of the callbacks generated by routers for ViewSets, unwrapped
+# from their closures once per callback
+action_maps = weakref.WeakKeyDictionary()
+action_maps_lock = threading.Lock()
+
+
+def clear_introspection_caches():
+    text_cache.clear()
+    with action_maps_lock:
+        action_maps.clear()
+
+
+# Single lines rendered by markdown, and by its fallback, as a mere paragraph
+PLAIN_TEXT_PATTERN = re.compile(r'[^\W_](?:[^\W_]|[ ,;:()/?!-])*\Z', re.UNICODE)
+
 
 class IntrospectorHelper(object):
     __metaclass__ = ABCMeta
@@ -76,6 +101,21 @@ class IntrospectorHelper(object):
         """
         Returns the first sentence of the first line of the class docstring
         """
+        if not uses_default_view_description():
+            return IntrospectorHelper._get_summary(callback, docstring)
+
+        # summaries only depend on the docstring
+        if docstring is None:
+            docstring = callback.__doc__
+        key = ('summary', docstring)
+        summary = text_cache.get(key)
+        if summary is None:
+            summary = text_cache.set(key, IntrospectorHelper._get_summary(
+                callback, docstring, plain_text_fast_path=True))
+        return summary
+
+    @staticmethod
+    def _get_summary(callback, docstring=None, plain_text_fast_path=False):
         description = get_view_description(
             callback, html=False, docstring=docstring) \
             .split("\n")[0].split(".")[0]
@@ -83,19 +123,97 @@ class IntrospectorHelper(object):
             description)
         description = IntrospectorHelper.strip_params_from_docstring(
             description)
+        if plain_text_fast_path:
+            # markup then stripped of its tags gives back the plain text
+            text = smart_text(description).strip()
+            if not text or PLAIN_TEXT_PATTERN.match(text):
+                return text
         description = strip_tags(get_view_description(
             callback, html=True, docstring=description))
         return description
 
 
+class ViewFactory(object):
+    """
+    Instantiates every view class once per generation. Introspectors get
+    shallow copies of that prototype, which they configure for their method,
+    so views with an expensive __init__ are only built once.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prototypes = {}
+        self._allowed_methods = {}
+
+    def get_prototype(self, callback):
+        with self._lock:
+            view = self._prototypes.get(callback)
+        if view is None:
+            view = callback()
+            with self._lock:
+                view = self._prototypes.setdefault(callback, view)
+        return view
+
+    def create_view(self, callback):
+        return copy.copy(self.get_prototype(callback))
+
+    def get_allowed_methods(self, callback):
+        with self._lock:
+            allowed_methods = self._allowed_methods.get(callback)
+        if allowed_methods is None:
+            allowed_methods = self.get_prototype(callback).allowed_methods
+            with self._lock:
+                self._allowed_methods[callback] = allowed_methods
+        return list(allowed_methods)
+
+
+class ViewSetRoutes(object):
+    """
+    The routes of a ViewSet class within a generation. The introspectors of
+    those routes share what only depends on the class: the actions of all
+    its routes and its parsed docstring.
+    """
+
+    def __init__(self, callback, patterns):
+        self.callback = callback
+        self.patterns = patterns
+        self._lock = threading.Lock()
+        self._methods = None
+        self._yaml_parser = None
+
+    def get_methods(self, introspector):
+        with self._lock:
+            methods = self._methods
+        if methods is None:
+            methods = []
+            for pattern in self.patterns:
+                if pattern.callback:
+                    methods.extend(introspector._resolve_methods(pattern).values())
+            with self._lock:
+                self._methods = methods
+        return list(methods)
+
+    def get_yaml_parser(self, introspector):
+        with self._lock:
+            parser = self._yaml_parser
+        if parser is None:
+            parser = YAMLDocstringParser(introspector)
+            with self._lock:
+                if self._yaml_parser is None:
+                    self._yaml_parser = parser
+                parser = self._yaml_parser
+        return parser
+
+
 class BaseViewIntrospector(object):
     __metaclass__ = ABCMeta
 
-    def __init__(self, callback, path, pattern, user):
+    def __init__(self, callback, path, pattern, user, view_factory=None):
         self.callback = callback
         self.path = path
         self.pattern = pattern
         self.user = user
+        self.view_factory = view_factory or ViewFactory()
 
     def get_yaml_parser(self):
         parser = YAMLDocstringParser(self)
@@ -130,29 +248,32 @@ class BaseMethodIntrospector(object):
         self.callback = view_introspector.callback
         self.path = view_introspector.path
         self.user = view_introspector.user
+        self._yaml_parser = None
+        self._serializer_class = _unset
 
     def get_module(self):
         return self.callback.__module__
 
     def check_yaml_methods(self, yaml_methods):
-        missing_set = set()
-        for key in yaml_methods:
-            if key not in self.parent.methods():
-                missing_set.add(key)
+        view_methods = self.parent.methods()
+        view_methods_set = set(view_methods)
+        missing_set = set(key for key in yaml_methods if key not in view_methods_set)
         if missing_set:
             raise Exception(
                 "methods %s in class docstring are not in view methods %s"
-                % (list(missing_set), list(self.parent.methods())))
+                % (list(missing_set), list(view_methods)))
 
     def get_yaml_parser(self):
-        parser = YAMLDocstringParser(self)
-        parent_parser = YAMLDocstringParser(self.parent)
-        self.check_yaml_methods(parent_parser.object.keys())
-        new_object = {}
-        new_object.update(parent_parser.object.get(self.method, {}))
-        new_object.update(parser.object)
-        parser.object = new_object
-        return parser
+        if self._yaml_parser is None:
+            parser = YAMLDocstringParser(self)
+            parent_parser = self.parent.get_yaml_parser()
+            self.check_yaml_methods(parent_parser.object.keys())
+            new_object = {}
+            new_object.update(parent_parser.object.get(self.method, {}))
+            new_object.update(parser.object)
+            parser.object = new_object
+            self._yaml_parser = parser
+        return self._yaml_parser
 
     def get_extra_serializer_classes(self):
         return self.get_yaml_parser().get_extra_serializer_classes(
@@ -168,9 +289,9 @@ class BaseMethodIntrospector(object):
                 return view.get_serializer_class()
 
     def create_view(self):
-        view = self.callback()
-        if not hasattr(view, 'kwargs'):
-            view.kwargs = dict()
+        view = self.parent.view_factory.create_view(self.callback)
+        # copies share the attributes of the prototype, kwargs is their own
+        view.kwargs = dict(getattr(view, 'kwargs', None) or {})
         if hasattr(self.parent.pattern, 'default_args'):
             view.kwargs.update(self.parent.pattern.default_args)
         view.request = HttpRequest()
@@ -179,11 +300,13 @@ class BaseMethodIntrospector(object):
         return view
 
     def get_serializer_class(self):
-        parser = self.get_yaml_parser()
-        serializer = parser.get_serializer_class(self.callback)
-        if serializer is None:
-            serializer = self.ask_for_serializer_class()
-        return serializer
+        if self._serializer_class is _unset:
+            parser = self.get_yaml_parser()
+            serializer = parser.get_serializer_class(self.callback)
+            if serializer is None:
+                serializer = self.ask_for_serializer_class()
+            self._serializer_class = serializer
+        return self._serializer_class
 
     def get_response_serializer_class(self):
         parser = self.get_yaml_parser()
@@ -224,12 +347,24 @@ class BaseMethodIntrospector(object):
         listed. First, get the class docstring and then get the method's. The
         methods will always inherit the class comments.
         """
+        method_docs = self.get_docs()
+        if not uses_default_view_description():
+            return self._get_description(method_docs, use_markdown)
+
+        # descriptions only depend on the class and method docstrings
+        key = ('description', self.callback.__doc__, method_docs, use_markdown)
+        description = text_cache.get(key)
+        if description is None:
+            description = text_cache.set(
+                key, self._get_description(method_docs, use_markdown))
+        return description
+
+    def _get_description(self, method_docs, use_markdown=False):
         docstring = ""
 
         class_docs = get_view_description(self.callback)
         class_docs = IntrospectorHelper.strip_yaml_from_docstring(class_docs)
         class_docs = IntrospectorHelper.strip_params_from_docstring(class_docs)
-        method_docs = self.get_docs()
 
         if class_docs is not None:
             docstring += class_docs + "  \n"
@@ -393,56 +528,7 @@ class BaseMethodIntrospector(object):
 
 
 def get_data_type(field):
-    # (in swagger 2.0 we might get to use the descriptive types..
-    from rest_framework import fields
-    if isinstance(field, fields.BooleanField):
-        return 'boolean', 'boolean'
-    elif field.__class__.__name__ == "JSONField":
-        return 'object', 'object'
-    elif isinstance(field, fields.ModelField) and field.model_field.__class__.__name__ == "JSONField":
-        return 'object', 'object'
-    elif isinstance(field, fields.DictField):
-        return 'object', 'object'
-    elif isinstance(field, fields.ListField):
-        return 'array', "array"
-    elif hasattr(fields, 'NullBooleanField') and isinstance(field, fields.NullBooleanField):
-        return 'boolean', 'boolean'
-    # elif isinstance(field, fields.URLField):
-        # return 'string', 'string' #  'url'
-    # elif isinstance(field, fields.SlugField):
-        # return 'string', 'string', # 'slug'
-    elif isinstance(field, fields.ChoiceField):
-        first_key = field.choices.keys()[0]
-        if isinstance(first_key, int):
-            return 'integer', 'int64'
-        return 'string', 'string'
-    # elif isinstance(field, fields.EmailField):
-        # return 'string', 'string' #  'email'
-    # elif isinstance(field, fields.RegexField):
-        # return 'string', 'string' # 'regex'
-    elif isinstance(field, fields.DateField):
-        return 'string', 'date'
-    elif isinstance(field, fields.DateTimeField):
-        return 'string', 'date-time'  # 'datetime'
-    # elif isinstance(field, fields.TimeField):
-        # return 'string', 'string' # 'time'
-    elif isinstance(field, fields.IntegerField):
-        return 'integer', 'int64'  # 'integer'
-    elif isinstance(field, fields.FloatField):
-        return 'number', 'float'  # 'float'
-    # elif isinstance(field, fields.DecimalField):
-        # return 'string', 'string' #'decimal'
-    # elif isinstance(field, fields.ImageField):
-        # return 'string', 'string' # 'image upload'
-    # elif isinstance(field, fields.FileField):
-        # return 'string', 'string' # 'file upload'
-    # elif isinstance(field, fields.CharField):
-        # return 'string', 'string'
-
-    elif rest_framework.VERSION >= '3.0.0' and isinstance(field, fields.HiddenField):
-        return 'hidden', 'hidden'
-    else:
-        return 'string', 'string'
+    return field_types.get_data_type(field)
 
 
 class APIViewIntrospector(BaseViewIntrospector):
@@ -451,7 +537,7 @@ class APIViewIntrospector(BaseViewIntrospector):
             yield APIViewMethodIntrospector(self, method)
 
     def methods(self):
-        return self.callback().allowed_methods
+        return self.view_factory.get_allowed_methods(self.callback)
 
 
 class GenericViewIntrospector(BaseViewIntrospector):
@@ -469,7 +555,7 @@ class GenericViewIntrospector(BaseViewIntrospector):
     }
 
     def __iter__(self):
-        for http_method, action in self.methods().iteritems():
+        for http_method, action in self.methods().items():
             yield GenericViewMethodIntrospector(self, action, http_method)
 
     def _get_action_from_http_method(self, http_method):
@@ -496,7 +582,7 @@ class GenericViewIntrospector(BaseViewIntrospector):
             }
         """
         methods = {}
-        for http_method in self.callback().allowed_methods:
+        for http_method in self.view_factory.get_allowed_methods(self.callback):
             methods[http_method] = self._get_action_from_http_method(http_method)
         return methods
 
@@ -507,7 +593,7 @@ class WrappedAPIViewIntrospector(BaseViewIntrospector):
             yield WrappedAPIViewMethodIntrospector(self, method)
 
     def methods(self):
-        return self.callback().allowed_methods
+        return self.view_factory.get_allowed_methods(self.callback)
 
     def get_notes(self):
         class_docs = get_view_description(self.callback)
@@ -565,25 +651,39 @@ class WrappedAPIViewMethodIntrospector(BaseMethodIntrospector):
         return self.parent.get_notes()
 
     def get_yaml_parser(self):
-        parser = YAMLDocstringParser(self)
-        return parser
+        if self._yaml_parser is None:
+            self._yaml_parser = YAMLDocstringParser(self)
+        return self._yaml_parser
 
 
 class ViewSetIntrospector(BaseViewIntrospector):
     """Handle ViewSet introspection."""
 
-    def __init__(self, callback, path, pattern, user, patterns=None):
-        super(ViewSetIntrospector, self).__init__(callback, path, pattern, user)
+    def __init__(self, callback, path, pattern, user, patterns=None, view_factory=None,
+                 routes=None):
+        super(ViewSetIntrospector, self).__init__(callback, path, pattern, user, view_factory)
         if not issubclass(callback, viewsets.ViewSetMixin):
             raise Exception("wrong callback passed to ViewSetIntrospector")
-        self.patterns = patterns or [pattern]
+        # the other routes of the same ViewSet, when introspected together
+        self.routes = routes
+        if routes is not None:
+            self.patterns = routes.patterns
+        else:
+            self.patterns = patterns or [pattern]
 
     def __iter__(self):
         methods = self._resolve_methods()
         for method in methods:
             yield ViewSetMethodIntrospector(self, methods[method], method)
 
+    def get_yaml_parser(self):
+        if self.routes is not None:
+            return self.routes.get_yaml_parser(self)
+        return super(ViewSetIntrospector, self).get_yaml_parser()
+
     def methods(self):
+        if self.routes is not None:
+            return self.routes.get_methods(self)
         stuff = []
         for pattern in self.patterns:
             if pattern.callback:
@@ -591,10 +691,23 @@ class ViewSetIntrospector(BaseViewIntrospector):
         return stuff
 
     def _resolve_methods(self, pattern=None):
-        from .decorators import closure_n_code, get_closure_var
         if pattern is None:
             pattern = self.pattern
         callback = pattern.callback
+        try:
+            actions = action_maps.get(callback)
+        except TypeError:
+            # not weakly referenceable, nor a router generated callback
+            return self._unwrap_actions(callback)
+        if actions is None:
+            actions = self._unwrap_actions(callback)
+            with action_maps_lock:
+                action_maps[callback] = actions
+        return actions
+
+    @staticmethod
+    def _unwrap_actions(callback):
+        from .decorators import closure_n_code, get_closure_var
 
         try:
             x = closure_n_code(callback)
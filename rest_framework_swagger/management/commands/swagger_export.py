@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import django
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework_swagger.config import SwaggerConfig
+from rest_framework_swagger.spec import (
+    build_document,
+    get_config_names,
+    get_spec_file_path,
+    render_document,
+    write_spec_file,
+)
+
+
+# (flags, keyword arguments) of the command line options, given to argparse
+# and, before Django 1.8, to optparse
+OPTIONS = (
+    (('--output-dir',), dict(
+        dest='output_dir', default=None,
+        help="Directory to write the documents to. Defaults to the "
+             "`precomputed_spec_dir` setting of each config.")),
+    (('--config',), dict(
+        action='append', dest='config_names', default=[],
+        help="Swagger config to export, may be repeated. "
+             "Defaults to every entry of SWAGGER_LOCAL_SETTINGS.")),
+    (('--api-version',), dict(
+        action='append', dest='versions', default=[],
+        help="API version to export, may be repeated. "
+             "Defaults to the `versions` setting of each config.")),
+    (('--gzip',), dict(
+        action='store_true', dest='gzip', default=False,
+        help="Also write a precompressed `.gz` sibling of every document.")),
+)
+
+
+def make_options(options):
+    from optparse import make_option
+    return tuple(make_option(*args, **kwargs) for args, kwargs in options)
+
+
+class Command(BaseCommand):
+    help = ("Generates the swagger document of every swagger config and API "
+            "version and writes them to disk, to be served by Swagger2JSONView "
+            "through the `precomputed_spec_dir` setting.")
+
+    def add_arguments(self, parser):
+        for args, kwargs in OPTIONS:
+            parser.add_argument(*args, **kwargs)
+
+    if django.VERSION < (1, 8):
+        option_list = BaseCommand.option_list + make_options(OPTIONS)
+
+    def handle(self, *args, **options):
+        swagger_config = SwaggerConfig()
+        config_names = options['config_names'] or get_config_names()
+
+        for config_name in config_names:
+            config = swagger_config.get_config(config_name)
+            output_dir = options['output_dir'] or config.get('precomputed_spec_dir')
+            if not output_dir:
+                raise CommandError(
+                    "No output directory for {}: set `precomputed_spec_dir` "
+                    "or use --output-dir".format(config_name))
+
+            versions = options['versions'] or config.get('versions', [])
+            if not versions:
+                raise CommandError(
+                    "No API version for {}: set `versions` "
+                    "or use --api-version".format(config_name))
+
+            for version in versions:
+                document = build_document(config_name, version, config=config)
+                path = get_spec_file_path(output_dir, config_name, version)
+                for written in write_spec_file(path, render_document(document), compress=options['gzip']):
+                    self.stdout.write("Wrote {}".format(written))
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Timing of the phases of spec generation.
+
+Generation code wraps its phases in `timed(phase)`. This costs next to
+nothing unless a `GenerationProfile` was activated for the current thread
+with `activate_profile`, in which case the wall time and call count of each
+phase are recorded, in total and per endpoint.
+"""
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from .compat import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# The last profile recorded for every (config_name, version)
+_recent_profiles = {}
+_recent_profiles_lock = threading.Lock()
+
+
+class GenerationProfile(object):
+    """
+    Wall time and call count of every phase of a spec generation
+    """
+
+    def __init__(self, config_name=None, version=None):
+        self.config_name = config_name
+        self.version = version
+        self.started = time.time()
+        self.total = None
+        self.phases = OrderedDict()
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, phase, elapsed, endpoint=None):
+        with self._lock:
+            _add(self.phases, phase, elapsed)
+            if endpoint is not None:
+                _add(self.endpoints.setdefault(endpoint, OrderedDict()), phase, elapsed)
+
+    def finish(self):
+        self.total = time.time() - self.started
+
+    def slowest_endpoints(self, limit=20, phase='introspection'):
+        timed_endpoints = [
+            (path, phases) for path, phases in self.endpoints.items()
+            if phase in phases
+        ]
+        timed_endpoints.sort(key=lambda item: item[1][phase]['time'], reverse=True)
+        return timed_endpoints[:limit]
+
+    def server_timing(self):
+        """
+        Returns the value of a `Server-Timing` header, durations in milliseconds
+        """
+        metrics = [
+            '{0};dur={1:.1f};desc="{2} calls"'.format(phase, data['time'] * 1000, data['count'])
+            for phase, data in self.phases.items()
+        ]
+        if self.total is not None:
+            metrics.append('total;dur={0:.1f}'.format(self.total * 1000))
+        return ', '.join(metrics)
+
+    def as_dict(self, limit=20):
+        return {
+            'config_name': self.config_name,
+            'version': self.version,
+            'started': self.started,
+            'total': self.total,
+            'phases': self.phases,
+            'slowest_endpoints': [
+                {'path': path, 'phases': phases}
+                for path, phases in self.slowest_endpoints(limit)
+            ],
+        }
+
+    def log(self):
+        record = {
+            'event': 'swagger_generation',
+            'config_name': self.config_name,
+            'version': self.version,
+            'total': self.total,
+            'endpoints': len(self.endpoints),
+            'phases': self.phases,
+        }
+        logger.info('swagger_generation %s', json.dumps(record, sort_keys=True),
+                    extra={'swagger_profile': record})
+
+
+def _add(phases, phase, elapsed):
+    data = phases.get(phase)
+    if data is None:
+        phases[phase] = {'time': elapsed, 'count': 1}
+    else:
+        data['time'] += elapsed
+        data['count'] += 1
+
+
+def get_active_profile():
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def activate_profile(profile, endpoint=None):
+    """
+    Records the phases timed by the current thread into `profile`,
+    attributing them to `endpoint` when given
+    """
+    previous = (getattr(_local, 'profile', None), getattr(_local, 'endpoint', None))
+    _local.profile = profile
+    _local.endpoint = endpoint if endpoint is not None else previous[1]
+    try:
+        yield profile
+    finally:
+        _local.profile, _local.endpoint = previous
+
+
+class timed(object):
+    """
+    Context manager recording its wall time as `phase` in the active profile
+    """
+    __slots__ = ('phase', 'profile', 'start')
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.profile = getattr(_local, 'profile', None)
+
+    def __enter__(self):
+        if self.profile is not None:
+            self.start = time.time()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.record(
+                self.phase, time.time() - self.start, getattr(_local, 'endpoint', None))
+
+
+def store_profile(profile):
+    with _recent_profiles_lock:
+        _recent_profiles[(profile.config_name, profile.version)] = profile
+
+
+def get_profile(config_name, version):
+    with _recent_profiles_lock:
+        return _recent_profiles.get((config_name, version))
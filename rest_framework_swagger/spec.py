@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""Builds, serializes and exports Swagger documents."""
+import gzip
+import hashlib
+import os
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+
+from .config import SwaggerConfig
+from .docgenerator import DocumentationGenerator
+from .profiling import timed
+from .urlparser import UrlParser
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    JSONRenderer = list(filter(
+        lambda item: item.format == 'json',
+        api_settings.DEFAULT_RENDERER_CLASSES,
+    ))[0]
+except IndexError:
+    from rest_framework.renderers import JSONRenderer
+
+SPEC_FILE_NAME = 'swagger.json'
+
+# Root fields of a document rendered one item at a time when streaming
+STREAMED_FIELDS = ('paths', 'definitions')
+
+
+def get_config_names():
+    return list(getattr(settings, 'SWAGGER_LOCAL_SETTINGS', {}).keys())
+
+
+def get_generator(config_name, version, config=None, user=None, request=None,
+                  tags=None, path_prefix=None):
+    if config is None:
+        config = SwaggerConfig().get_config(config_name)
+    generator = DocumentationGenerator(
+        for_user=user,
+        config=config,
+        config_name=config_name,
+        request=request,
+        version=version,
+        tags=tags,
+        path_prefix=path_prefix,
+    )
+    return config, generator
+
+
+def build_document(config_name, version, config=None, user=None, request=None,
+                   tags=None, path_prefix=None):
+    """
+    Generates the swagger document of a config for an API version.
+    `request` is optional, so documents can be built outside of a view.
+    `tags` and `path_prefix` restrict the document to the matching
+    operations and the definitions they reference.
+    """
+    config, generator = get_generator(
+        config_name, version, config, user, request, tags, path_prefix)
+    endpoints = UrlParser(config, request).get_apis()
+    return generator.get_root(endpoints)
+
+
+def stream_document(config_name, version, config=None, user=None, request=None,
+                    tags=None, path_prefix=None):
+    """
+    Generates the swagger document like build_document, yielding its JSON
+    bytes in chunks instead of rendering them at once. Nothing is generated
+    before the first chunk is requested.
+    """
+    config, generator = get_generator(
+        config_name, version, config, user, request, tags, path_prefix)
+    endpoints = UrlParser(config, request).get_apis()
+    for chunk in iter_chunks(iter_render_document(generator.iter_root(endpoints))):
+        yield chunk
+
+
+def render_document(document):
+    """
+    Returns the JSON bytes of a document, as served by Swagger2JSONView
+    """
+    with timed('render'):
+        return JSONRenderer().render(document)
+
+
+def iter_render_document(root_items):
+    """
+    Yields the JSON bytes of a document given as (key, value) pairs by
+    `DocumentationGenerator.iter_root`, rendering the values of its
+    streamed fields one item at a time
+    """
+    renderer = JSONRenderer()
+    if getattr(renderer, 'compact', False):
+        item_separator, key_separator = b',', b':'
+    else:
+        item_separator, key_separator = b', ', b': '
+
+    def render(value):
+        # renderers return an empty body for None
+        return renderer.render(value) if value is not None else b'null'
+
+    yield b'{'
+    for index, (key, value) in enumerate(root_items):
+        if index:
+            yield item_separator
+        yield render(key) + key_separator
+        if key not in STREAMED_FIELDS:
+            yield render(value)
+            continue
+
+        yield b'{'
+        for item_index, (name, item) in enumerate(value):
+            if item_index:
+                yield item_separator
+            yield render(name) + key_separator + render(item)
+        yield b'}'
+    yield b'}'
+
+
+def iter_chunks(pieces, chunk_size=64 * 1024):
+    """
+    Joins small pieces of bytes into chunks of about `chunk_size` bytes
+    """
+    buf, size = [], 0
+    for piece in pieces:
+        buf.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield b''.join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b''.join(buf)
+
+
+def get_etag(content):
+    """
+    Returns a strong entity tag for the JSON bytes of a document
+    """
+    return '"{0}"'.format(hashlib.sha1(content).hexdigest())
+
+
+def get_spec_file_path(directory, config_name, version):
+    return os.path.join(
+        directory, config_name or 'default', str(version), SPEC_FILE_NAME)
+
+
+def write_spec_file(path, content, compress=False):
+    """
+    Writes the JSON bytes of a document to `path` and, if `compress` is set,
+    a gzip compressed `.gz` sibling. Files are replaced atomically.
+    """
+    directory = os.path.dirname(path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    written = [path]
+    _write_atomically(path, content)
+    if compress:
+        _write_atomically(path + '.gz', gzip_content(content))
+        written.append(path + '.gz')
+    return written
+
+
+def read_spec_file(path):
+    with open(path, 'rb') as spec_file:
+        return spec_file.read()
+
+
+def gzip_content(content):
+    buf = BytesIO()
+    with gzip.GzipFile(filename='', mode='wb', fileobj=buf, mtime=0) as zfile:
+        zfile.write(content)
+    return buf.getvalue()
+
+
+def brotli_content(content):
+    return brotli.compress(bytes(content))
+
+
+def get_encoders():
+    """
+    Returns the available content codings, by order of preference
+    """
+    encoders = []
+    if brotli is not None:
+        encoders.append(('br', brotli_content))
+    encoders.append(('gzip', gzip_content))
+    return encoders
+
+
+def get_encoding_preference():
+    return [coding for coding, _ in get_encoders()]
+
+
+def compress_content(content):
+    """
+    Returns the content encoded with every available content coding
+    """
+    return dict((coding, encode(content)) for coding, encode in get_encoders())
+
+
+def _write_atomically(path, content):
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as spec_file:
+        spec_file.write(content)
+    os.rename(tmp_path, path)
@@ -1,98 +1,201 @@
+import re
+import threading
+from collections import namedtuple
 from importlib import import_module
+from django.conf import settings
 from django.core.urlresolvers import RegexURLResolver, RegexURLPattern
 from django.contrib.admindocs.views import simplify_regex
+from django.test.signals import setting_changed
+from django.utils import six
 
 from rest_framework.views import APIView
+from rest_framework.viewsets import ViewSetMixin
+
+from .compat import OrderedDict
+from .profiling import timed
+
+
+def get_urlconf(request=None):
+    """
+    Returns the urlconf used for request, the project's one by default
+    """
+    return getattr(request, "urlconf", None) or settings.ROOT_URLCONF
+
+
+# An API pattern of a flattened URL tree, with the modules and namespaces
+# of the resolvers it is included through
+UrlIndexEntry = namedtuple(
+    'UrlIndexEntry', ['path', 'pattern', 'callback', 'name', 'modules', 'namespaces'])
+
+# Flattened URL trees, keyed by (parser class, urlconf)
+_url_indexes = {}
+_url_indexes_lock = threading.Lock()
+
+
+def get_url_index(urlconf, parser_class=None):
+    """
+    Returns the API patterns of urlconf, walking its tree only once
+    """
+    parser_class = parser_class or UrlParser
+    key = (parser_class, urlconf)
+    index = _url_indexes.get(key)
+    if index is None:
+        with _url_indexes_lock:
+            index = _url_indexes.get(key)
+            if index is None:
+                if isinstance(urlconf, six.string_types):
+                    urls = import_module(urlconf)
+                else:
+                    urls = urlconf
+                index = tuple(parser_class.__flatten_patterns_tree__(urls.urlpatterns))
+                _url_indexes[key] = index
+    return index
+
+
+def group_viewset_patterns(apis):
+    """
+    Returns the patterns of the routes of every ViewSet of apis, keyed by
+    ViewSet class. Routers generate one route per list, detail or extra
+    action URL of a ViewSet, all sharing its class.
+    """
+    groups = OrderedDict()
+    for api in apis:
+        callback = api['callback']
+        if isinstance(callback, type) and issubclass(callback, ViewSetMixin):
+            groups.setdefault(callback, []).append(api['pattern'])
+    return groups
+
+
+def clear_url_index():
+    """
+    Forgets the flattened URL trees, to be called when urlconfs change
+    """
+    with _url_indexes_lock:
+        _url_indexes.clear()
+
+
+def clear_on_setting_changed(*args, **kwargs):
+    # also done by cache.clear_all_caches, when that module is loaded
+    if kwargs['setting'] == 'ROOT_URLCONF':
+        clear_url_index()
+
+
+setting_changed.connect(clear_on_setting_changed)
 
 
 class UrlParser(object):
 
     def __init__(self, config, request):
-        self.urlconf = getattr(request, "urlconf", None)
-        self.exclude_namespaces = config.get('exclude_namespaces', [])
-        self.exclude_module_paths = config.get('exclude_module_paths', [])
-        self.include_module_paths = config.get('include_module_paths', [])
+        self.urlconf = get_urlconf(request)
+        self.exclude_namespaces = frozenset(config.get('exclude_namespaces', []))
+        self.exclude_module_paths = frozenset(config.get('exclude_module_paths', []))
+        self.include_module_paths = frozenset(config.get('include_module_paths', []))
         self.exclude_url_patterns = config.get('exclude_url_patterns', [])
-        self.exclude_url_patterns_names = config.get('exclude_url_patterns_names', [])
+        self.exclude_url_patterns_names = frozenset(config.get('exclude_url_patterns_names', []))
+        self.exclude_url_patterns_re = None
+        if self.exclude_url_patterns:
+            self.exclude_url_patterns_re = re.compile(
+                '|'.join(re.escape(excluded) for excluded in self.exclude_url_patterns))
 
     def get_apis(self):
         """
         Returns all the DRF APIViews found in the project URLs
         """
-        urls = import_module(self.urlconf)
-        return self.__flatten_patterns_tree__(urls.urlpatterns)
+        with timed('urlparser'):
+            return [
+                {
+                    'path': entry.path,
+                    'pattern': entry.pattern,
+                    'callback': entry.callback,
+                }
+                for entry in get_url_index(self.urlconf, type(self))
+                if self.is_included(entry)
+            ]
+
+    def is_included(self, entry):
+        """
+        Applies the include and exclude settings to an UrlIndexEntry
+        """
+        # only modules included on the include_module_paths list
+        if self.include_module_paths and not entry.modules <= self.include_module_paths:
+            return False
+
+        # except modules included on the exclude_module_paths list
+        if not entry.modules.isdisjoint(self.exclude_module_paths):
+            return False
+
+        if not entry.namespaces.isdisjoint(self.exclude_namespaces):
+            return False
+
+        if self.exclude_url_patterns_re is not None and \
+                self.exclude_url_patterns_re.search(entry.path):
+            return False
 
-    def __assemble_endpoint_data__(self, pattern, prefix=''):
+        return entry.name not in self.exclude_url_patterns_names
+
+    @classmethod
+    def __assemble_endpoint_data__(cls, pattern, prefix='', modules=frozenset(),
+                                   namespaces=frozenset()):
         """
-        Creates a dictionary for matched API urls
+        Creates an UrlIndexEntry for matched API urls
 
         pattern -- the pattern to parse
         prefix -- the API path prefix (used by recursion)
+        modules -- the url modules of the enclosing resolvers
+        namespaces -- the namespaces of the enclosing resolvers
         """
-        callback = self.__get_pattern_api_callback__(pattern)
+        callback = cls.__get_pattern_api_callback__(pattern)
 
-        if callback is None or self.__exclude_router_api_root__(callback):
+        if callback is None or cls.__exclude_router_api_root__(callback):
             return
 
         path = simplify_regex(prefix + pattern.regex.pattern)
         path = path.replace('<', '{').replace('>', '}')
 
-        if self.__exclude_format_endpoints__(path):
+        if cls.__exclude_format_endpoints__(path):
             return
 
-        return {
-            'path': path,
-            'pattern': pattern,
-            'callback': callback,
-        }
+        return UrlIndexEntry(path, pattern, callback, pattern.name, modules, namespaces)
 
-    def __flatten_patterns_tree__(self, patterns, prefix=''):
+    @classmethod
+    def __flatten_patterns_tree__(cls, patterns, prefix='', modules=frozenset(),
+                                  namespaces=frozenset()):
         """
-        Uses recursion to flatten url tree.
+        Uses recursion to flatten url tree, regardless of the settings.
 
         patterns -- urlpatterns list
         prefix -- (optional) Prefix for URL pattern
+        modules -- (optional) url modules of the enclosing resolvers
+        namespaces -- (optional) namespaces of the enclosing resolvers
         """
         pattern_list = []
 
         for pattern in patterns:
 
             if isinstance(pattern, RegexURLPattern):
-                endpoint_data = self.__assemble_endpoint_data__(pattern, prefix)
-
-                if endpoint_data is None:
-                    continue
-
-                if any(excluded in endpoint_data['path'] for excluded in self.exclude_url_patterns):
-                    continue
+                endpoint_data = cls.__assemble_endpoint_data__(
+                    pattern, prefix, modules, namespaces)
 
-                if endpoint_data['pattern'].name in self.exclude_url_patterns_names:
-                    continue
-
-                pattern_list.append(endpoint_data)
+                if endpoint_data is not None:
+                    pattern_list.append(endpoint_data)
 
             elif isinstance(pattern, RegexURLResolver):
                 api_urls_module = pattern.urlconf_name.__name__ if hasattr(pattern.urlconf_name, '__name__') else ""
-                # only modules included on the include_module_paths list
-                if self.include_module_paths and api_urls_module not in self.include_module_paths:
-                    continue
-
-                # except modules included on the exclude_module_paths list
-                if api_urls_module in self.exclude_module_paths:
-                    continue
-
-                if pattern.namespace is not None and pattern.namespace in self.exclude_namespaces:
-                    continue
+                pattern_namespaces = namespaces
+                if pattern.namespace is not None:
+                    pattern_namespaces = namespaces | frozenset([pattern.namespace])
 
-                pref = prefix + pattern.regex.pattern
-                pattern_list.extend(self.__flatten_patterns_tree__(
+                pattern_list.extend(cls.__flatten_patterns_tree__(
                     pattern.url_patterns,
-                    prefix=pref
+                    prefix=prefix + pattern.regex.pattern,
+                    modules=modules | frozenset([api_urls_module]),
+                    namespaces=pattern_namespaces,
                 ))
 
         return pattern_list
 
-    def __get_pattern_api_callback__(self, pattern):
+    @staticmethod
+    def __get_pattern_api_callback__(pattern):
         """
         Verifies that pattern callback is a subclass of APIView, and returns the class
         Handles older django & django rest 'cls_instance'
@@ -108,13 +211,15 @@ class UrlParser(object):
                 isinstance(pattern.callback.cls_instance, APIView)):
             return pattern.callback.cls_instance
 
-    def __exclude_router_api_root__(self, callback):
+    @staticmethod
+    def __exclude_router_api_root__(callback):
         """
         Returns True if the URL's callback is rest_framework.routers.APIRoot
         """
         return callback.__module__ == 'rest_framework.routers'
 
-    def __exclude_format_endpoints__(self, path):
+    @staticmethod
+    def __exclude_format_endpoints__(path):
         """
         Excludes URL patterns that contain .{format}
         """
@@ -1,6 +1,7 @@
 from django.conf.urls import patterns
 from django.conf.urls import url
-from rest_framework_swagger.views import SwaggerUIView, Swagger2JSONView
+from rest_framework_swagger.views import (
+    SwaggerUIView, Swagger2JSONView, SwaggerPartialJSONView, SwaggerProfileView)
 
 urlpatterns = patterns(
     '',
@@ -14,6 +15,36 @@ urlpatterns = patterns(
         Swagger2JSONView.as_view(),
         name='django.swagger.2.0.json.view'
     ),
+    url(
+        r'^(?P<swagger_config_name>[\w]+)/tags/(?P<tags>[^/]+)/swagger\.json$',
+        SwaggerPartialJSONView.as_view(),
+        name='django.swagger.2.0.json.tags.view'
+    ),
+    url(
+        r'^tags/(?P<tags>[^/]+)/swagger\.json$',
+        SwaggerPartialJSONView.as_view(),
+        name='django.swagger.2.0.json.tags.view'
+    ),
+    url(
+        r'^(?P<swagger_config_name>[\w]+)/paths/(?P<path_prefix>.+)/swagger\.json$',
+        SwaggerPartialJSONView.as_view(),
+        name='django.swagger.2.0.json.paths.view'
+    ),
+    url(
+        r'^paths/(?P<path_prefix>.+)/swagger\.json$',
+        SwaggerPartialJSONView.as_view(),
+        name='django.swagger.2.0.json.paths.view'
+    ),
+    url(
+        r'^(?P<swagger_config_name>[\w]+)/profile\.json$',
+        SwaggerProfileView.as_view(),
+        name='django.swagger.profile.view'
+    ),
+    url(
+        r'^profile\.json$',
+        SwaggerProfileView.as_view(),
+        name='django.swagger.profile.view'
+    ),
     url(
         r'^(?P<swagger_config_name>[\w]+)/?$',
         SwaggerUIView.as_view(),
@@ -1,8 +1,15 @@
 # -*- coding: utf-8 -*-
 import rest_framework
 import inspect
+import threading
+import weakref
 
+from django.utils import six
+from django.utils.encoding import smart_text
 from rest_framework.compat import apply_markdown
+from rest_framework.utils import formatting
+from rest_framework.views import get_view_description as default_view_description
+from .compat import OrderedDict
 from .constants import INTROSPECTOR_PRIMITIVES
 
 
@@ -24,14 +31,46 @@ def get_serializer_name(serializer):
         return serializer.__class__.__name__
 
 
+def uses_default_view_description():
+    """
+    Whether descriptions only depend on docstrings, allowing them to be memoized
+    """
+    return rest_framework.settings.api_settings.VIEW_DESCRIPTION_FUNCTION \
+        is default_view_description
+
+
 def get_view_description(view_cls, html=False, docstring=None):
-    if docstring is not None:
-        view_cls = type(
+    if not uses_default_view_description():
+        description_function = rest_framework.settings.api_settings.VIEW_DESCRIPTION_FUNCTION
+        if docstring is not None:
+            view_cls = get_docstring_view(view_cls, docstring)
+        return description_function(view_cls, html)
+
+    if docstring is None:
+        docstring = view_cls.__doc__
+    key = (docstring, html)
+    description = view_description_cache.get(key)
+    if description is None:
+        # same as rest_framework.views.get_view_description
+        description = formatting.dedent(smart_text(docstring or ''))
+        if html:
+            description = formatting.markup_description(description)
+        description = view_description_cache.set(key, description)
+    return description
+
+
+def get_docstring_view(view_cls, docstring):
+    """
+    Returns a subclass of view_cls documented by docstring, created once
+    """
+    key = (view_cls, docstring)
+    fake_cls = docstring_views_cache.get(key)
+    if fake_cls is None:
+        fake_cls = docstring_views_cache.set(key, type(
             view_cls.__name__ + '_fake',
             (view_cls,),
-            {'__doc__': docstring})
-    return rest_framework.settings.api_settings \
-        .VIEW_DESCRIPTION_FUNCTION(view_cls, html)
+            {'__doc__': docstring}))
+    return fake_cls
 
 
 def get_default_value(field):
@@ -56,12 +95,45 @@ def extract_base_path(path, base_path):
     return path
 
 
+DEFINITION_REF_PREFIX = '#/definitions/'
+
+
+def get_reachable_definitions(definitions, roots):
+    """
+    Returns the definitions referenced, directly or through other
+    definitions, by a `$ref` found in one of the `roots` objects
+    """
+    reachable = set()
+    pending = list(roots)
+    while pending:
+        obj = pending.pop()
+        if isinstance(obj, dict):
+            ref = obj.get('$ref')
+            if isinstance(ref, six.string_types) and ref.startswith(DEFINITION_REF_PREFIX):
+                name = ref[len(DEFINITION_REF_PREFIX):]
+                if name not in reachable and name in definitions:
+                    reachable.add(name)
+                    pending.append(definitions[name])
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            pending.extend(obj)
+
+    return OrderedDict(
+        (name, definition) for name, definition in definitions.items()
+        if name in reachable
+    )
+
+
 def do_markdown(docstring):
-    # Markdown is optional
-    if apply_markdown:
-        return apply_markdown(docstring)
-    else:
-        return docstring.replace("\n\n", "<br/>")
+    html = markdown_cache.get(docstring)
+    if html is None:
+        # Markdown is optional
+        if apply_markdown:
+            html = apply_markdown(docstring)
+        else:
+            html = docstring.replace("\n\n", "<br/>")
+        html = markdown_cache.set(docstring, html)
+    return html
 
 
 def multi_getattr(obj, attr, default=None):
@@ -112,3 +184,84 @@ def normalize_data_format(data_type, data_format, obj):
         del obj['format']
     elif data_format is not None:
         obj['format'] = data_format
+
+
+class LRUCache(object):
+    """
+    Thread-safe mapping bounded to `maxsize` entries; the least recently
+    used entries are discarded first
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class WeakClassCache(object):
+    """
+    Thread-safe memoization of values computed from classes. Weakly keyed, so
+    classes dropped by a code reload are dropped from the cache too
+    """
+    def __init__(self):
+        self._data = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get_or_set(self, cls, compute):
+        with self._lock:
+            try:
+                return self._data[cls]
+            except KeyError:
+                pass
+        value = compute(cls)
+        with self._lock:
+            self._data[cls] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Descriptions computed by the default VIEW_DESCRIPTION_FUNCTION, which only
+# depend on the docstring, keyed by (docstring, html)
+view_description_cache = LRUCache(maxsize=4096)
+
+# HTML rendered by do_markdown, keyed by docstring
+markdown_cache = LRUCache(maxsize=4096)
+
+# Subclasses overriding the docstring of a view, handed to custom
+# VIEW_DESCRIPTION_FUNCTIONs, keyed by (view_cls, docstring)
+docstring_views_cache = LRUCache(maxsize=1024)
+
+
+def clear_view_description_cache():
+    view_description_cache.clear()
+    markdown_cache.clear()
+    docstring_views_cache.clear()
@@ -1,22 +1,30 @@
+import logging
+import os
+
 from django.views.generic import View
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.shortcuts import render_to_response, RequestContext
 from django.core.exceptions import PermissionDenied
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
 from .config import SwaggerConfig
+from .cache import RenderedSpec, spec_cache
+from .profiling import GenerationProfile, activate_profile, get_profile, store_profile
 
 from rest_framework.views import Response, APIView
-from rest_framework.settings import api_settings
 from rest_framework.permissions import AllowAny
 
-from rest_framework_swagger.urlparser import UrlParser
-from rest_framework_swagger.docgenerator import DocumentationGenerator
+from rest_framework_swagger.urlparser import get_urlconf
+from rest_framework_swagger.spec import (
+    JSONRenderer,
+    build_document,
+    get_encoding_preference,
+    get_spec_file_path,
+    read_spec_file,
+    stream_document,
+)
 
-try:
-    JSONRenderer = list(filter(
-        lambda item: item.format == 'json',
-        api_settings.DEFAULT_RENDERER_CLASSES,
-    ))[0]
-except IndexError:
-    from rest_framework.renderers import JSONRenderer
+logger = logging.getLogger(__name__)
 
 
 class BaseSwaggerView(object):
@@ -59,18 +67,218 @@ class SwaggerUIView(BaseSwaggerView, View):
 class Swagger2JSONView(BaseSwaggerView, APIView):
     permission_classes = (AllowAny,)
     renderer_classes = (JSONRenderer, )
+    # filters of a partial document, passed to DocumentationGenerator
+    subset = None
 
     def get(self, request, version, swagger_config_name=None):
         self.check_permission(request, swagger_config_name)
-        paths = self.get_paths()
-        generator = DocumentationGenerator(
-            for_user=request.user,
+        if self.config.get('precomputed_spec_dir') and not self.subset:
+            response = self.get_precomputed_response(request, version, swagger_config_name)
+            if response is not None:
+                return response
+
+        if self.config.get('stream_spec') and not self.config.get('cache_spec'):
+            return StreamingHttpResponse(
+                self.stream_document(version, swagger_config_name),
+                content_type='application/json')
+
+        profile = None
+        if self.config.get('profile_generation'):
+            profile = GenerationProfile(swagger_config_name or 'default', version)
+            with activate_profile(profile):
+                spec = self.get_spec(version, swagger_config_name)
+            profile.finish()
+        else:
+            spec = self.get_spec(version, swagger_config_name)
+
+        encoding = choose_encoding(request, spec.encodings)
+        etag = get_encoded_etag(spec.etag, encoding)
+        if is_not_modified(request, etag, spec.last_modified):
+            response = HttpResponseNotModified()
+        elif spec.streamed:
+            response = StreamingHttpResponse(
+                spec.iter_content(encoding=encoding), content_type='application/json')
+        else:
+            response = HttpResponse(spec.get_content(encoding), content_type='application/json')
+        set_validators(response, etag, spec.last_modified)
+        if spec.encodings:
+            if encoding is not None and response.status_code == 200:
+                response['Content-Encoding'] = encoding
+            patch_vary_headers(response, ('Accept-Encoding',))
+
+        # only report generations that happened during this request
+        if profile is not None and profile.phases:
+            response['Server-Timing'] = profile.server_timing()
+            profile.log()
+            store_profile(profile)
+        return response
+
+    def get_spec(self, version, swagger_config_name):
+        if not self.config.get('cache_spec'):
+            return RenderedSpec(
+                self.get_document(version, swagger_config_name, self.request.user))
+
+        # cached documents are served to every user, so they are built for an
+        # anonymous one, as by the warmup, rather than for the first requester
+        key = spec_cache.make_key(
+            swagger_config_name, version, get_urlconf(self.request), self.subset)
+        return spec_cache.get_or_build(
+            key, lambda: self.get_document(version, swagger_config_name), self.config)
+
+    def get_document(self, version, swagger_config_name, user=None):
+        return build_document(
+            swagger_config_name,
+            version,
             config=self.config,
-            config_name=swagger_config_name,
-            request=request
+            user=user,
+            request=self.request,
+            **(self.subset or {})
         )
-        return Response(generator.get_root(paths))
 
-    def get_paths(self):
-        urlparser = UrlParser(self.config, self.request)
-        return urlparser.get_apis()
+    def stream_document(self, version, swagger_config_name):
+        return stream_document(
+            swagger_config_name,
+            version,
+            config=self.config,
+            user=self.request.user,
+            request=self.request,
+            **(self.subset or {})
+        )
+
+    def get_precomputed_response(self, request, version, swagger_config_name):
+        """
+        Serves the document exported by the `swagger_export` command, if any
+        """
+        path = get_spec_file_path(
+            self.config['precomputed_spec_dir'], swagger_config_name, version)
+        accepts_gzip = choose_encoding(request, ['gzip']) == 'gzip'
+
+        try:
+            stat = os.stat(path)
+            encoding = 'gzip' if accepts_gzip and os.path.exists(path + '.gz') else None
+            etag = get_encoded_etag(
+                '"{0:x}-{1:x}"'.format(int(stat.st_mtime), stat.st_size), encoding)
+            if is_not_modified(request, etag, stat.st_mtime):
+                response = HttpResponseNotModified()
+            elif encoding == 'gzip':
+                response = HttpResponse(
+                    read_spec_file(path + '.gz'), content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(
+                    read_spec_file(path), content_type='application/json')
+        except (IOError, OSError):
+            logger.warning("No precomputed swagger document at {}".format(path))
+            return None
+
+        set_validators(response, etag, stat.st_mtime)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class SwaggerPartialJSONView(Swagger2JSONView):
+    """
+    Serves the part of the document made of the operations tagged with one
+    of the comma separated `tags`, or of the paths starting with
+    `path_prefix`, along with the definitions they reference
+    """
+
+    def get(self, request, version, swagger_config_name=None, tags=None, path_prefix=None):
+        subset = {}
+        if tags:
+            subset['tags'] = tuple(sorted(tag for tag in tags.split(',') if tag))
+        if path_prefix:
+            subset['path_prefix'] = '/' + path_prefix.strip('/')
+        self.subset = subset
+        return super(SwaggerPartialJSONView, self).get(request, version, swagger_config_name)
+
+
+class SwaggerProfileView(BaseSwaggerView, APIView):
+    """
+    Lists the slowest endpoints of the last profiled generation of a config
+    """
+    permission_classes = (AllowAny,)
+    renderer_classes = (JSONRenderer, )
+
+    def get(self, request, version, swagger_config_name=None):
+        self.check_permission(request, swagger_config_name)
+        if not self.config.get('profile_generation'):
+            raise Http404()
+
+        profile = get_profile(swagger_config_name or 'default', version)
+        if profile is None:
+            raise Http404()
+
+        try:
+            limit = int(request.GET.get('limit', 20))
+        except ValueError:
+            limit = 20
+        return Response(profile.as_dict(limit))
+
+
+def is_not_modified(request, etag, last_modified):
+    """
+    Checks the conditional request headers against the validators of the
+    current document
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        etags = [tag.strip() for tag in if_none_match.split(',')]
+        etags = [tag[2:] if tag.startswith('W/') else tag for tag in etags]
+        return etag in etags or '*' in etags
+
+    if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+    if if_modified_since is not None:
+        if_modified_since = parse_http_date_safe(if_modified_since)
+        return (if_modified_since is not None and
+                int(last_modified) <= if_modified_since)
+    return False
+
+
+def get_accepted_encodings(request):
+    """
+    Returns the quality of the content codings listed by Accept-Encoding
+    """
+    accepted = {}
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        params = item.strip().split(';')
+        coding = params[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        accepted[coding] = quality
+    return accepted
+
+
+def choose_encoding(request, encodings):
+    """
+    Returns the preferred of `encodings` accepted by the client, or None
+    """
+    if not encodings:
+        return None
+    accepted = get_accepted_encodings(request)
+    for encoding in get_encoding_preference():
+        if encoding in encodings and accepted.get(encoding, accepted.get('*', 0)) > 0:
+            return encoding
+    return None
+
+
+def get_encoded_etag(etag, encoding):
+    """
+    Returns a distinct entity tag for every content coding of a document
+    """
+    if encoding is None:
+        return etag
+    return '{0}-{1}"'.format(etag[:-1], encoding)
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
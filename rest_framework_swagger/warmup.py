@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Fills the spec cache when a process starts serving, so the first request to
+swagger.json after a deploy does not pay for the generation.
+"""
+import logging
+import threading
+
+from django.core.signals import request_started
+
+from .cache import spec_cache
+from .config import SwaggerConfig, get_global_setting
+from .spec import build_document, get_config_names
+from .urlparser import get_urlconf
+
+logger = logging.getLogger(__name__)
+
+WARMUP_DISPATCH_UID = 'rest_framework_swagger.warmup'
+
+_warmup_lock = threading.Lock()
+_warmup_started = False
+
+
+def get_warmup_configs():
+    """
+    Returns the (config_name, config) pairs whose specs are to be warmed up
+    """
+    swagger_config = SwaggerConfig()
+    warmup_configs = []
+    for config_name in get_config_names():
+        config = swagger_config.get_config(config_name)
+        if config.get('warmup_spec_cache') and config.get('cache_spec'):
+            warmup_configs.append((config_name, config))
+    return warmup_configs
+
+
+def warm_spec_cache(configs=None):
+    """
+    Builds the spec of every version of the given configs into the spec
+    cache, the configs opting in through `warmup_spec_cache` by default.
+    Returns the keys that were filled.
+    """
+    if configs is None:
+        configs = get_warmup_configs()
+
+    urlconf = get_urlconf()
+    keys = []
+    for config_name, config in configs:
+        versions = config.get('versions', [])
+        if not versions:
+            logger.warning("Cannot warm up the %s swagger spec: no `versions` set", config_name)
+            continue
+        for version in versions:
+            key = spec_cache.make_key(config_name, version, urlconf)
+            try:
+                spec_cache.get_or_build(
+                    key,
+                    lambda: build_document(config_name, version, config=config),
+                    config,
+                )
+            except Exception:
+                logger.exception("Failed to warm up the %s swagger spec of version %s",
+                                 config_name, version)
+            else:
+                keys.append(key)
+    return keys
+
+
+def start_warmup():
+    """
+    Warms the spec cache up in a background thread, or synchronously when
+    the global `warmup_synchronously` setting is set. Only the first call of
+    a process warms up. Every app must be ready: call it from the WSGI
+    module, after get_wsgi_application(), or let the first request do it.
+    """
+    global _warmup_started
+    with _warmup_lock:
+        if _warmup_started:
+            return None
+        _warmup_started = True
+
+    configs = get_warmup_configs()
+    if not configs:
+        return None
+
+    if get_global_setting('warmup_synchronously', False):
+        warm_spec_cache(configs)
+        return None
+
+    thread = threading.Thread(target=warm_spec_cache, args=(configs,), name='swagger-warmup')
+    thread.daemon = True
+    thread.start()
+    return thread
+
+
+def warm_up_on_first_request(sender=None, **kwargs):
+    request_started.disconnect(dispatch_uid=WARMUP_DISPATCH_UID)
+    try:
+        start_warmup()
+    except Exception:
+        # requests must not fail because of the documentation
+        logger.exception("Failed to warm up the swagger spec cache")
+
+
+def schedule_warmup():
+    """
+    Warms up on the first request of the process rather than at startup, so
+    that management commands never do, and so that the URLconf is only
+    imported once every app is ready
+    """
+    request_started.connect(warm_up_on_first_request, dispatch_uid=WARMUP_DISPATCH_UID)
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import sys
 import yaml
 import importlib
 from django.utils import six
@@ -7,7 +8,127 @@ from django.contrib.admindocs.utils import trim_docstring
 from rest_framework.utils import formatting
 
 from .compat import OrderedDict
-from .utils import multi_getattr, normalize_data_format, get_serializer_name
+from .profiling import timed
+from .utils import (multi_getattr, normalize_data_format, get_serializer_name,
+                    LRUCache)
+
+# Parsed YAML keyed by docstring text, shared by every parser instance.
+# Cached objects are shared too and must be treated as read-only.
+docstring_cache = LRUCache(maxsize=2048)
+
+
+def clear_docstring_cache():
+    docstring_cache.clear()
+
+
+# Classes referenced by docstrings keyed by (path, calling module). Misses
+# are cached too, as the error to raise again.
+class_cache = LRUCache(maxsize=4096)
+
+
+def clear_class_cache():
+    class_cache.clear()
+
+
+class ClassReference(object):
+    """
+    Outcome of resolving a docstring reference: either `obj` or the type and
+    arguments of the error to raise, along with the (name, module, attribute)
+    lookups made. A reference is stale once one of those modules was
+    replaced in `sys.modules`, once the class it resolved to was rebound by a
+    reload, or, for a miss, once one of the attributes looked up exists, like
+    after a reload adding the class to the same module object.
+    """
+    __slots__ = ('obj', 'error', 'modules')
+
+    def __init__(self, obj=None, error=None, modules=()):
+        self.obj = obj
+        self.error = error
+        self.modules = modules
+
+    def is_stale(self):
+        obj = self.obj
+        for name, module, attribute in self.modules:
+            if sys.modules.get(name) is not module:
+                return True
+            if obj is None:
+                try:
+                    if multi_getattr(module, attribute) is not None:
+                        return True
+                except AttributeError:
+                    pass
+        if obj is not None and hasattr(obj, '__module__') and hasattr(obj, '__name__'):
+            owner = sys.modules.get(obj.__module__)
+            if owner is not None and getattr(owner, obj.__name__, obj) is not obj:
+                return True
+        return False
+
+    def resolve(self):
+        if self.error is not None:
+            error_class, args = self.error
+            raise error_class(*args)
+        return self.obj
+
+
+def find_class(cls_path, calling_module):
+    """
+    Looks `cls_path` up the way docstrings reference classes and returns
+    its `ClassReference`
+    """
+    package = None
+
+    if '.' not in cls_path:
+        # within current module/file
+        class_name = cls_path
+        module_path = calling_module
+    else:
+        # relative or fully qualified path import
+        class_name = cls_path.split('.')[-1]
+        module_path = ".".join(cls_path.split('.')[:-1])
+
+        if cls_path.startswith('.'):
+            # relative lookup against current package
+            # ..serializers.FooSerializer
+            package = calling_module
+
+    modules = []
+    class_obj = None
+    # Try to perform local or relative/fq import
+    try:
+        module = importlib.import_module(module_path, package=package)
+        modules.append((module.__name__, module, class_name))
+        class_obj = getattr(module, class_name, None)
+    except ImportError:
+        pass
+    except ValueError as e:
+        return ClassReference(error=(ValueError, e.args), modules=tuple(modules))
+
+    # Class was not found, maybe it was imported to callback module?
+    # from app.serializers import submodule
+    # serializer: submodule.FooSerializer
+    if class_obj is None:
+        try:
+            module = importlib.import_module(calling_module)
+            modules.append((module.__name__, module, cls_path))
+            class_obj = multi_getattr(module, cls_path, None)
+        except (ImportError, AttributeError):
+            message = "Could not find %s, looked in %s" % (
+                cls_path, modules[-1][1] if modules else calling_module)
+            return ClassReference(error=(Exception, (message,)), modules=tuple(modules))
+
+    return ClassReference(obj=class_obj, modules=tuple(modules))
+
+
+def resolve_class(cls_path, calling_module):
+    """
+    Returns the class referenced as `cls_path` by a docstring of
+    `calling_module`, resolved once per module generation
+    """
+    key = (cls_path, calling_module)
+    reference = class_cache.get(key)
+    if reference is None or reference.is_stale():
+        reference = class_cache.set(key, find_class(cls_path, calling_module))
+    return reference.resolve()
 
 
 class YAMLDocstringParser(object):
@@ -165,7 +286,22 @@ class YAMLDocstringParser(object):
             self.object = {}
 
     def load_obj_from_docstring(self, docstring):
-        """Loads YAML from docstring"""
+        """Loads YAML from docstring, parsing each docstring text only once"""
+        with timed('yaml'):
+            cached = docstring_cache.get(docstring)
+            if cached is None:
+                cached = docstring_cache.set(
+                    docstring, self._parse_docstring(docstring))
+        obj, yaml_error = cached
+        if yaml_error is not None:
+            self.yaml_error = yaml_error
+        return obj
+
+    @staticmethod
+    def _parse_docstring(docstring):
+        """
+        Returns a `(object, yaml_error)` tuple for the YAML part of docstring
+        """
         split_lines = trim_docstring(docstring).split('\n')
 
         # Cut YAML from rest of docstring
@@ -175,59 +311,26 @@ class YAMLDocstringParser(object):
                 cut_from = index
                 break
         else:
-            return None
+            return None, None
 
         yaml_string = "\n".join(split_lines[cut_from:])
         yaml_string = formatting.dedent(yaml_string)
         try:
-            return yaml.load(yaml_string)
+            return yaml.load(yaml_string), None
         except yaml.YAMLError as e:
-            self.yaml_error = e
-            return None
+            return None, e
 
     def _load_class(self, cls_path, callback):
         """
         Dynamically load a class from a string
         """
+        with timed('load_class'):
+            return self._import_class(cls_path, callback)
+
+    def _import_class(self, cls_path, callback):
         if not cls_path or not callback or not hasattr(callback, '__module__'):
             return None
-
-        package = None
-
-        if '.' not in cls_path:
-            # within current module/file
-            class_name = cls_path
-            module_path = self.method_introspector.get_module()
-        else:
-            # relative or fully qualified path import
-            class_name = cls_path.split('.')[-1]
-            module_path = ".".join(cls_path.split('.')[:-1])
-
-            if cls_path.startswith('.'):
-                # relative lookup against current package
-                # ..serializers.FooSerializer
-                package = self.method_introspector.get_module()
-
-        class_obj = None
-        # Try to perform local or relative/fq import
-        try:
-            module = importlib.import_module(module_path, package=package)
-            class_obj = getattr(module, class_name, None)
-        except ImportError:
-            pass
-
-        # Class was not found, maybe it was imported to callback module?
-        # from app.serializers import submodule
-        # serializer: submodule.FooSerializer
-        if class_obj is None:
-            try:
-                module = importlib.import_module(
-                    self.method_introspector.get_module())
-                class_obj = multi_getattr(module, cls_path, None)
-            except (ImportError, AttributeError):
-                raise Exception("Could not find %s, looked in %s" % (cls_path, module))
-
-        return class_obj
+        return resolve_class(cls_path, self.method_introspector.get_module())
 
     def get_serializer_class(self, callback):
         """